@@ -3,10 +3,16 @@ from __future__ import absolute_import, unicode_literals, division
 import logging
 import codecs
 import os
+import sys
+import subprocess
 import functools
+import multiprocessing
 import datetime
 
 from pymorphy2 import MorphAnalyzer
+from pymorphy2.analyzer import LazyParse
+from pymorphy2 import parallel
+from pymorphy2 import units
 from benchmarks import utils
 
 logger = logging.getLogger('pymorphy2.bench')
@@ -30,6 +36,59 @@ def load_words(path=DATA_PATH):
 def get_total_usages(words):
     return sum(w[1] for w in words)
 
+def get_tokens(words):
+    """ Return a list of tokens with words repeated according to their counts """
+    return [word for word, cnt in words for x in range(cnt)]
+
+def get_unknown_words(morph, words):
+    """
+    Return a list of (word, count) tuples with words which are not
+    in the dictionary; they are created from dictionary words
+    by replacing their first letters.
+    """
+    res = []
+    for word, cnt in words:
+        if len(word) < 5:
+            continue
+        new_word = 'бя' + word[2:]
+        if not morph.word_is_known(new_word):
+            res.append((new_word, cnt))
+    return res
+
+
+def bench_unknown(morph, words, repeats):
+    unknown_words = get_unknown_words(morph, words)
+    suffix_analyzer = [
+        unit for (unit, is_terminal) in morph._units
+        if isinstance(unit, units.KnownSuffixAnalyzer)
+    ][0]
+
+    def _run_parse():
+        for word, cnt in unknown_words:
+            morph.parse(word)
+
+    def _run_tag():
+        for word, cnt in unknown_words:
+            morph.tag(word)
+
+    def _run_suffix_parse():
+        for word, cnt in unknown_words:
+            suffix_analyzer.parse(word, word, set())
+
+    def _run_suffix_tag():
+        for word, cnt in unknown_words:
+            suffix_analyzer.tag(word, word, set())
+
+    measure = functools.partial(utils.measure, repeats=repeats)
+    count = len(unknown_words)
+
+    logger.info("    morph.parse(w): %0.0f words/sec", measure(_run_parse, count))
+    logger.info("    morph.tag(w): %0.0f words/sec", measure(_run_tag, count))
+    logger.info("    KnownSuffixAnalyzer.parse(w): %0.0f words/sec", measure(_run_suffix_parse, count))
+    logger.info("    KnownSuffixAnalyzer.tag(w): %0.0f words/sec", measure(_run_suffix_tag, count))
+    logger.info("")
+
+
 def bench_tag(morph, words, total_usages, repeats):
     word_no_umlauts = [(w[0].replace('ё', 'е'), w[1]) for w in words]
 
@@ -50,12 +109,18 @@ def bench_tag(morph, words, total_usages, repeats):
         for word, cnt in words:
             str(morph.tag(word))
 
+    tokens = get_tokens(words)
+
+    def _run_many():
+        morph.tag_many(tokens)
+
     measure = functools.partial(utils.measure, repeats=repeats)
 
     logger.info("    morph.tag(w): %0.0f words/sec (considering word frequencies)", measure(_run, total_usages))
     logger.info("    morph.tag(w): %0.0f words/sec", measure(_run_nofreq, len(words)))
     logger.info("    morph.tag(w): %0.0f words/sec (umlauts removed from input)", measure(_run_no_umlauts, len(words)))
     logger.info("    morph.tag(w): %0.0f words/sec (str(tag) called)", measure(_run_str, len(words)))
+    logger.info("    morph.tag_many(words): %0.0f words/sec (considering word frequencies)", measure(_run_many, total_usages))
 
 
 def bench_parse(morph, words, total_usages, repeats):
@@ -68,6 +133,14 @@ def bench_parse(morph, words, total_usages, repeats):
         for word, cnt in words:
             morph.parse(word)
 
+    tokens = get_tokens(words)
+
+    def _run_many():
+        morph.parse_many(tokens)
+
+    def _run_batch():
+        morph.parse_batch(tokens)
+
     def _run_normal_form():
         for word, cnt in words:
             [p.normal_form for p in morph.parse(word)]
@@ -105,6 +178,10 @@ def bench_parse(morph, words, total_usages, repeats):
         for word, cnt in words[::5]:
             [p.lexeme for p in morph.parse(word)]
 
+    def _run_inflect():
+        for word, cnt in words:
+            [p.inflect(set(['plur', 'datv'])) for p in morph.parse(word)]
+
     measure = functools.partial(utils.measure, repeats=repeats)
 
     def show_info(bench_name, func, note='', count=len(words)):
@@ -116,12 +193,15 @@ def bench_parse(morph, words, total_usages, repeats):
 
     show_info('morph.parse(w)', _run_nofreq)
     show_info('morph.parse(w)', _run, '(considering word frequencies)', total_usages)
+    show_info('morph.parse_many(words)', _run_many, '(considering word frequencies)', total_usages)
+    show_info('morph.parse_batch(words)', _run_batch, '(considering word frequencies)', total_usages)
 
     if morph._result_type is not None:
         show_info('morph.word_is_known(w)', _run_word_is_known, count=len(words)*10)
         show_info("[p.normal_form for p in morph.parse(w)]", _run_normal_form)
         show_info("[p.normalized for p in morph.parse(w)]", _run_normalized)
         show_info("[p.lexeme for p in morph.parse(w)]", _run_lexeme, count=len(words)/5)
+        show_info("[p.inflect({'plur', 'datv'}) for p in morph.parse(w)]", _run_inflect)
         show_info("[{'NOUN'} in p.tag for p in morph.parse(w)]", _run_is_noun)
         show_info("[p.tag.POS == 'NOUN' for p in morph.parse(w)]", _run_is_noun2)
         show_info("[p.tag.cyr_repr for p in morph.parse(word)]", _run_cyr_repr)
@@ -131,11 +211,156 @@ def bench_parse(morph, words, total_usages, repeats):
     logger.info("")
 
 
+def bench_dictionary(morph, words, repeats):
+    dictionary = morph.dictionary
+    para_data = [
+        dictionary.words.similar_items(word, morph.char_substitutes)
+        for word, cnt in words
+    ]
+
+    def _run_build():
+        for word_data in para_data:
+            for fixed_word, parses in word_data:
+                for para_id, idx in parses:
+                    dictionary.build_normal_form(para_id, idx, fixed_word)
+                    dictionary.build_tag_info(para_id, idx)
+
+    def _run_lookup():
+        for word, cnt in words:
+            dictionary.words.similar_items(word, morph.char_substitutes)
+
+    measure = functools.partial(utils.measure, repeats=repeats)
+
+    logger.info("    dictionary.build_normal_form + build_tag_info: %0.0f words/sec", measure(_run_build, len(words)))
+    logger.info("    dictionary.words.similar_items(w): %0.0f words/sec", measure(_run_lookup, len(words)))
+    logger.info("")
+
+
+def bench_parse_memory(morph, words):
+    """ Log memory used by parse results for all ``words`` """
+    try:
+        import tracemalloc
+    except ImportError:
+        logger.info("    tracemalloc is not available")
+        return
+
+    tracemalloc.start()
+    try:
+        start_size = tracemalloc.get_traced_memory()[0]
+        res = [morph.parse(word) for word, cnt in words]
+        size = tracemalloc.get_traced_memory()[0] - start_size
+    finally:
+        tracemalloc.stop()
+
+    parse_count = sum(len(parses) for parses in res)
+    logger.info("    [morph.parse(w) for w in words]: %0.1f MB, %0.0f bytes/parse",
+                size / 1024 / 1024, size / parse_count)
+
+
+def bench_parallel(morph, words, total_usages, repeats):
+    tokens = get_tokens(words)
+    measure = functools.partial(utils.measure, repeats=repeats)
+
+    def _run(func, jobs):
+        return lambda: list(func(tokens, morph, jobs=jobs))
+
+    for jobs in sorted(set([1, 2, multiprocessing.cpu_count()])):
+        logger.info("    parallel.lemmatize_corpus(tokens, jobs=%d): %0.0f words/sec",
+                    jobs, measure(_run(parallel.lemmatize_corpus, jobs), total_usages))
+        logger.info("    parallel.parse_corpus(tokens, jobs=%d): %0.0f words/sec",
+                    jobs, measure(_run(parallel.parse_corpus, jobs), total_usages))
+    logger.info("")
+
+
+_STARTUP_SCRIPT = """
+import time
+start = time.time()
+import pymorphy2
+imported = time.time()
+pymorphy2.MorphAnalyzer(%r)
+created = time.time()
+print(imported - start, created - imported)
+"""
+
+
+def bench_startup(repeats, dict_path=None):
+    """
+    Measure 'import pymorphy2' and MorphAnalyzer() time
+    in fresh Python processes.
+    """
+    times = []
+    for x in range(repeats):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _STARTUP_SCRIPT % dict_path])
+        times.append([float(t) for t in output.split()])
+
+    import_time = min(t[0] for t in times)
+    create_time = min(t[1] for t in times)
+    logger.info("    import pymorphy2: %0.3fs", import_time)
+    logger.info("    MorphAnalyzer(): %0.3fs", create_time)
+    logger.info("")
+
+
+_FORK_MEMORY_SCRIPT = """
+import codecs
+import gc
+import os
+import pymorphy2
+
+def private_dirty():
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Private_Dirty:'):
+                return int(line.split()[1]) * 1024
+
+with codecs.open(%(data_path)r, 'r', 'utf8') as f:
+    words = [line.split()[0] for line in f]
+
+if %(preload)r:
+    morph = pymorphy2.preload(%(dict_path)r)
+else:
+    morph = pymorphy2.MorphAnalyzer(%(dict_path)r)
+
+read_fd, write_fd = os.pipe()
+pid = os.fork()
+if pid == 0:
+    start = private_dirty()
+    for word in words:
+        morph.parse(word)
+    gc.collect()
+    os.write(write_fd, str(private_dirty() - start).encode('ascii'))
+    os._exit(0)
+
+os.close(write_fd)
+os.waitpid(pid, 0)
+print(os.read(read_fd, 100).decode('ascii'))
+"""
+
+
+def bench_fork_memory(dict_path=None):
+    """
+    Measure private memory (RSS) growth of a forked process which
+    parses words using MorphAnalyzer created before fork.
+    """
+    if not hasattr(os, 'fork') or not os.path.exists('/proc/self/smaps_rollup'):
+        logger.info("    fork or /proc/self/smaps_rollup is not available")
+        return
+
+    for preload in [False, True]:
+        script = _FORK_MEMORY_SCRIPT % dict(
+            data_path=DATA_PATH, dict_path=dict_path, preload=preload)
+        growth = int(subprocess.check_output([sys.executable, '-c', script]))
+        logger.info("    private RSS growth after fork: %0.1f MB %s",
+                    growth/(1024*1024), "(pymorphy2.preload)" if preload else "")
+    logger.info("")
+
+
 def bench_all(repeats, dict_path=None):
     """ Run all benchmarks """
     logger.debug("loading MorphAnalyzer...")
     morph = MorphAnalyzer(dict_path)
     morph_plain = MorphAnalyzer(dict_path, result_type=None)
+    morph_lazy = MorphAnalyzer(dict_path, result_type=LazyParse)
 
     logger.debug("loading benchmark data...")
     words = load_words()
@@ -145,12 +370,36 @@ def bench_all(repeats, dict_path=None):
 
     start_time = datetime.datetime.now()
 
+    logger.info("\nbenchmarking startup time:")
+    bench_startup(repeats, dict_path)
+
     logger.info("\nbenchmarking MorphAnalyzer():")
     bench_parse(morph, words, total_usages, repeats)
     bench_tag(morph, words, total_usages, repeats)
 
+    logger.info("\nbenchmarking unknown words:")
+    bench_unknown(morph, words, repeats)
+
+    logger.info("\nbenchmarking Dictionary:")
+    bench_dictionary(morph, words, repeats)
+
+    logger.info("\nbenchmarking pymorphy2.parallel:")
+    bench_parallel(morph, words, total_usages, repeats)
+
     logger.info("\nbenchmarking MorphAnalyzer(result_type=None):")
     bench_parse(morph_plain, words, total_usages, repeats)
 
+    logger.info("\nbenchmarking MorphAnalyzer(result_type=LazyParse):")
+    bench_parse(morph_lazy, words, total_usages, repeats)
+
+    logger.info("\nbenchmarking memory usage after fork:")
+    bench_fork_memory(dict_path)
+
+    logger.info("\nbenchmarking memory usage:")
+    for name, _morph in [('Parse', morph), ('None', morph_plain), ('LazyParse', morph_lazy)]:
+        logger.info("  result_type=%s", name)
+        bench_parse_memory(_morph, words)
+    logger.info("")
+
     end_time = datetime.datetime.now()
     logger.info("----\nDone in %s.\n" % (end_time-start_time))
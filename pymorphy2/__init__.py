@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
 from .version import __version__
-from .analyzer import MorphAnalyzer
+from .analyzer import MorphAnalyzer, preload, release_preloaded
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function, unicode_literals, division
 import os
+import gc
 import heapq
 import collections
 import logging
@@ -9,7 +10,13 @@ import operator
 import warnings
 
 from pymorphy2 import opencorpora_dict
-from pymorphy2.dawg import ConditionalProbDistDAWG
+from pymorphy2.batch import ParseBatch
+from pymorphy2.cache import LRUCache, cached_list, lru_cache
+from pymorphy2.dawg import (
+    ConditionalProbDistDAWG,
+    ConditionalProbDistRecordDAWG,
+    WordsDawg,
+)
 import pymorphy2.lang
 
 logger = logging.getLogger(__name__)
@@ -17,6 +24,10 @@ logger = logging.getLogger(__name__)
 _Parse = collections.namedtuple('Parse', 'word, tag, normal_form, score, methods_stack')
 
 _score_getter = operator.itemgetter(3)
+
+# P(t|w) data keyed by word; see ProbabilityEstimator.
+CPD_RECORD_DAWG_FILENAME = 'p_t_given_w.recorddawg'
+
 auto = object()
 
 
@@ -41,6 +52,26 @@ class Parse(_Parse):
         """
         return self.inflect(self.tag.numeral_agreement_grammemes(num))
 
+    def make_agree_with_numbers(self, nums):
+        """
+        Return a list of forms which agree with numbers from ``nums``
+        (the same as ``[p.make_agree_with_number(num) for num in nums]``,
+        but the word is inflected only once per agreement class,
+        see :meth:`OpencorporaTag.numeral_agreement_class`).
+        """
+        get_class = self.tag.numeral_agreement_class
+        forms = {}
+        result = []
+        for num in nums:
+            index = get_class(num)
+            try:
+                form = forms[index]
+            except KeyError:
+                grammemes = self.tag._numeral_agreement_class_grammemes(index)
+                form = forms[index] = self.inflect(grammemes)
+            result.append(form)
+        return result
+
     @property
     def lexeme(self):
         """ A lexeme this form belongs to. """
@@ -65,17 +96,163 @@ class Parse(_Parse):
     #     return self._dict.build_paradigm_info(self.para_id)
 
 
+class LazyParse(object):
+    """
+    Parse result wrapper which uses less memory than :class:`Parse`
+    and computes ``normal_form`` and ``methods_stack`` of dictionary words
+    only when they are accessed. Use it (via ``result_type`` argument
+    of :class:`MorphAnalyzer`) if only ``word``, ``tag`` and ``score``
+    are needed for most parses.
+
+    LazyParse objects can be unpacked and indexed like :class:`Parse`
+    namedtuples.
+    """
+    __slots__ = ['word', 'tag', 'score', '_normal_form', '_methods_stack',
+                 '_dict_method']
+
+    # MorphAnalyzer checks this attribute; dictionary analyzer units
+    # return parses with normal_form=None and a single method
+    # instead of methods_stack when it is True.
+    _lazy = True
+
+    _morph = None
+    """ :type _morph: MorphAnalyzer """
+
+    _dict = None
+    """ :type _dict: pymorphy2.opencorpora_dict.Dictionary """
+
+    def __init__(self, word, tag, normal_form, score, methods_stack):
+        self.word = word
+        self.tag = tag
+        self.score = score
+        if normal_form is None:
+            self._normal_form = None
+            self._methods_stack = None
+            self._dict_method = methods_stack
+        else:
+            self._normal_form = normal_form
+            self._methods_stack = methods_stack
+            self._dict_method = None
+
+    @property
+    def normal_form(self):
+        normal_form = self._normal_form
+        if normal_form is None:
+            analyzer, fixed_word, para_id, idx = self._dict_method
+            normal_form = self._dict.build_normal_form(para_id, idx, fixed_word)
+            self._normal_form = normal_form
+        return normal_form
+
+    @property
+    def methods_stack(self):
+        methods_stack = self._methods_stack
+        if methods_stack is None:
+            methods_stack = self._methods_stack = (self._dict_method,)
+        return methods_stack
+
+    def __iter__(self):
+        yield self.word
+        yield self.tag
+        yield self.normal_form
+        yield self.score
+        yield self.methods_stack
+
+    def __len__(self):
+        return 5
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, (tuple, LazyParse)):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        res = self.__eq__(other)
+        return res if res is NotImplemented else not res
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return str("%s(word=%r, tag=%r, normal_form=%r, score=%r, methods_stack=%r)") % (
+            self.__class__.__name__, self.word, self.tag, self.normal_form,
+            self.score, self.methods_stack
+        )
+
+    # the rest of the API is the same as in Parse
+    inflect = vars(Parse)['inflect']
+    make_agree_with_number = vars(Parse)['make_agree_with_number']
+    make_agree_with_numbers = vars(Parse)['make_agree_with_numbers']
+    lexeme = vars(Parse)['lexeme']
+    is_known = vars(Parse)['is_known']
+    normalized = vars(Parse)['normalized']
+
+
 class ProbabilityEstimator(object):
-    def __init__(self, dict_path):
-        cpd_path = os.path.join(dict_path, 'p_t_given_w.intdawg')
-        self.p_t_given_w = ConditionalProbDistDAWG().load(cpd_path)
+    """
+    Estimates parse scores using P(t|w) data stored in the dictionary.
+
+    When ``gramtab`` is passed and the dictionary has P(t|w) data
+    keyed by word (see
+    :func:`pymorphy2.opencorpora_dict.probability.build_cpd_record_dawg`),
+    probabilities of all tags of a word are fetched using
+    a single lookup.
+    """
+    def __init__(self, dict_path, gramtab=None):
+        record_dawg_path = os.path.join(dict_path, CPD_RECORD_DAWG_FILENAME)
+        if gramtab is not None and os.path.exists(record_dawg_path):
+            self.p_t_given_w = ConditionalProbDistRecordDAWG().load(record_dawg_path)
+            # Tag ids are ids in this dictionary gramtab. Tags are
+            # interned (and kept alive by the gramtab), so they are
+            # looked up by identity.
+            self._gramtab = gramtab
+            self._tag_ids = {}
+            for tag_id, tag in enumerate(gramtab):
+                self._tag_ids.setdefault(id(tag), tag_id)
+            # tags which are not in the gramtab are looked up by string
+            self._extra_tag_ids = self.p_t_given_w.extra_tag_ids()
+            self.tag_probs = self._tag_probs_by_word
+        else:
+            cpd_path = os.path.join(dict_path, 'p_t_given_w.intdawg')
+            self.p_t_given_w = ConditionalProbDistDAWG().load(cpd_path)
+
+    def tag_probs(self, word_lower, tags):
+        """ Return a list of P(t|w) estimates for each tag in ``tags``. """
+        prob = self.p_t_given_w.prob
+        return [prob(word_lower, tag) for tag in tags]
+
+    def _tag_probs_by_word(self, word_lower, tags):
+        probs = self.p_t_given_w.probs(word_lower)
+        if not probs:
+            return [0.0] * len(tags)
+
+        tag_ids = self._tag_ids
+        extra_tag_ids = self._extra_tag_ids
+        res = []
+        for tag in tags:
+            tag_id = tag_ids.get(id(tag))
+            if tag_id is None:
+                # unknown tags get id -1 and probability 0
+                tag_id = extra_tag_ids.get(str(tag), -1)
+            res.append(probs.get(tag_id, 0.0))
+        return res
+
+    def tag_probs_many(self, words_lower, tags_lists):
+        """
+        Return a list of :meth:`tag_probs` results for each
+        ``(word_lower, tags)`` pair.
+        """
+        tag_probs = self.tag_probs
+        return [tag_probs(word_lower, tags)
+                for word_lower, tags in zip(words_lower, tags_lists)]
 
     def apply_to_parses(self, word, word_lower, parses):
         if not parses:
             return parses
 
-        probs = [self.p_t_given_w.prob(word_lower, tag)
-                for (word, tag, normal_form, score, methods_stack) in parses]
+        probs = self.tag_probs(word_lower, [parse[1] for parse in parses])
 
         if sum(probs) == 0:
             # no P(t|w) information is available; return normalized estimate
@@ -95,32 +272,67 @@ class ProbabilityEstimator(object):
     def apply_to_tags(self, word, word_lower, tags):
         if not tags:
             return tags
-        return sorted(tags,
-            key=lambda tag: self.p_t_given_w.prob(word_lower, tag),
-            reverse=True
-        )
+        probs = self.tag_probs(word_lower, tags)
+        order = sorted(range(len(tags)), key=probs.__getitem__, reverse=True)
+        return [tags[index] for index in order]
 
 
-def _iter_entry_points(*args, **kwargs):
-    """ Like pkg_resources.iter_entry_points, but uses a WorkingSet which
-    is not populated at startup. This ensures that all entry points
-    are picked up, even if a package which provides them is installed
-    after the current process is started.
-
-    The main use case is to make ``!pip install pymorphy2`` work
-    within a Jupyter or Google Colab notebook.
-    See https://github.com/kmike/pymorphy2/issues/131
+def _map_distinct(func, words):
+    """
+    Return ``[func(word) for word in words]``, but call ``func`` only once
+    for each distinct word. ``func`` must return a list; each word gets
+    its own copy of the list.
     """
-    import pkg_resources
-    ws = pkg_resources.WorkingSet()
-    return ws.iter_entry_points(*args, **kwargs)
+    results = {}
+    res = []
+    append = res.append
+    for word in words:
+        try:
+            word_res = results[word]
+        except KeyError:
+            word_res = results[word] = func(word)
+        append(list(word_res))
+    return res
+
+
+def _iter_entry_points(group):
+    """ Return entry points of a ``group`` from all installed packages.
+
+    Packages are looked up each time this function is called, so that
+    all entry points are picked up, even if a package which provides them
+    is installed after the current process is started.
+
+    ``importlib.metadata`` (or ``importlib_metadata`` backport) is used
+    if it is available: it is much faster to import than
+    ``pkg_resources``.
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            from importlib_metadata import entry_points
+        except ImportError:
+            entry_points = None
+
+    if entry_points is None:
+        import pkg_resources
+        ws = pkg_resources.WorkingSet()
+        return ws.iter_entry_points(group)
+
+    eps = entry_points()
+    if hasattr(eps, 'select'):
+        return eps.select(group=group)
+    return eps.get(group, [])
 
 
+@lru_cache(maxsize=1)
 def _lang_dict_paths():
-    paths = dict(
-        (pkg.name, pkg.load().get_path())
-        for pkg in _iter_entry_points('pymorphy2_dicts')
-    )
+    paths = {}
+    for pkg in _iter_entry_points('pymorphy2_dicts'):
+        # the same package may be found several times;
+        # the first one is used (as in sys.path order)
+        if pkg.name not in paths:
+            paths[pkg.name] = pkg.load().get_path()
 
     # discovery of pymorphy2 v0.8 dicts
     try:
@@ -132,9 +344,28 @@ def _lang_dict_paths():
     return paths
 
 
+def refresh_lang_dict_paths():
+    """
+    Forget dictionary paths found before. Installed dictionaries are
+    discovered once per process (a new lookup is only done when
+    a dictionary for some language is not found); call this function
+    if dictionary packages are upgraded or removed at runtime.
+
+    The main use case is ``!pip install`` within a Jupyter or
+    Google Colab notebook. See https://github.com/kmike/pymorphy2/issues/131
+    """
+    _lang_dict_paths.cache_clear()
+
+
 def lang_dict_path(lang):
     """ Return language-specific dictionary path """
     lang_paths = _lang_dict_paths()
+    if lang not in lang_paths:
+        # a dictionary package may be installed after
+        # the paths are found
+        refresh_lang_dict_paths()
+        lang_paths = _lang_dict_paths()
+
     if lang in lang_paths:
         return lang_paths[lang]
 
@@ -179,6 +410,33 @@ class MorphAnalyzer(object):
 
         >>> morph = pymorphy2.MorphAnalyzer(result_type=None)
 
+    Pass ``result_type=LazyParse`` to get :class:`LazyParse` objects
+    which compute normal forms only when they are accessed
+    (e.g. for POS tagging)::
+
+        >>> morph = pymorphy2.MorphAnalyzer(result_type=LazyParse)
+
+    Pass ``cache_size`` argument to make analyzer memoize results
+    of :meth:`parse`, :meth:`tag` and :meth:`normal_forms` methods
+    (at most ``cache_size`` words are cached for each method)::
+
+        >>> morph = pymorphy2.MorphAnalyzer(cache_size=10000)
+        >>> morph.cache_info()['parse']
+        CacheInfo(hits=0, misses=0, evictions=0, maxsize=10000, currsize=0)
+
+    Analyzer units which parse parts of words (e.g. hyphenated words)
+    memoize these parses; ``subword_cache_size`` is a max number of
+    cached parts for each unit (pass 0 to disable this cache).
+
+    If the same dictionary is used by several processes (e.g. web server
+    workers), pass ``use_mmap=True`` to load dictionary tables using mmap;
+    this way memory is shared between the processes. See
+    :func:`pymorphy2.opencorpora_dict.storage.load_dict`.
+
+    Analyzers created in the same process share a loaded dictionary
+    (see :func:`pymorphy2.opencorpora_dict.get_dictionary`), so creating
+    another analyzer for the same dictionary is cheap.
+
     """
     DICT_PATH_ENV_VARIABLE = 'PYMORPHY2_DICT_PATH'
     DEFAULT_UNITS = pymorphy2.lang.ru.DEFAULT_UNITS
@@ -188,11 +446,14 @@ class MorphAnalyzer(object):
     _lock = threading.RLock()
 
     def __init__(self, path=None, lang=None, result_type=Parse, units=None,
-                 probability_estimator_cls=auto, char_substitutes=auto):
+                 probability_estimator_cls=auto, char_substitutes=auto,
+                 cache_size=None, use_mmap=False, subword_cache_size=10000):
 
         # save arguments for pickling/unpickling
         self._path = path
         self._lang = lang
+        self._use_mmap = use_mmap
+        self._subword_cache_size = subword_cache_size
 
         if path is None and lang is None:
             lang = 'ru'
@@ -200,7 +461,7 @@ class MorphAnalyzer(object):
         path = self.choose_dictionary_path(path, lang)
 
         with self._lock:
-            self.dictionary = opencorpora_dict.Dictionary(path)
+            self.dictionary = opencorpora_dict.get_dictionary(path, use_mmap=use_mmap)
             self.lang = self.choose_language(self.dictionary, lang)
 
             self.prob_estimator = self._get_prob_estimator(
@@ -213,7 +474,7 @@ class MorphAnalyzer(object):
                 res_type = type(
                     result_type.__name__,
                     (result_type,),
-                    {'_morph': self, '_dict': self.dictionary}
+                    {'_morph': self, '_dict': self.dictionary, '__slots__': ()}
                 )
                 self._result_type = res_type
             else:
@@ -222,6 +483,7 @@ class MorphAnalyzer(object):
             self._result_type_orig = result_type
             self._init_char_substitutes(char_substitutes)
             self._init_units(units)
+            self._init_cache(cache_size)
 
     def _init_units(self, units_unbound=None):
         if units_unbound is None:
@@ -237,10 +499,30 @@ class MorphAnalyzer(object):
             else:
                 self._units.append((self._bound_unit(item), True))
 
+        if getattr(self._result_type, '_lazy', False):
+            for unit, is_terminal in self._units:
+                if hasattr(unit, 'lazy_normal_forms'):
+                    unit.lazy_normal_forms = True
+
+        # other components are loaded on first access
+        components = set()
+        for unit, is_terminal in self._units:
+            components.update(unit.dictionary_components)
+        self.dictionary.load_components(sorted(components))
+
+    def _init_cache(self, cache_size):
+        self._cache_size = cache_size
+        self._caches = {}
+        if not cache_size:
+            return
+
+        for name in ['parse', 'tag', 'normal_forms']:
+            self._caches[name] = LRUCache(cache_size)
+
     def _init_char_substitutes(self, char_substitutes):
         if char_substitutes is auto:
             char_substitutes = self._config_value('CHAR_SUBSTITUTES', self.DEFAULT_SUBSTITUTES)
-        self.char_substitutes = self.dictionary.words.compile_replaces(char_substitutes or {})
+        self.char_substitutes = WordsDawg.compile_replaces(char_substitutes or {})
 
     def _bound_unit(self, unit):
         unit = unit.clone()
@@ -267,6 +549,24 @@ class MorphAnalyzer(object):
                 estimator_cls = ProbabilityEstimator
         if estimator_cls is auto or estimator_cls is None:
             return None
+        if isinstance(estimator_cls, type) and issubclass(estimator_cls, ProbabilityEstimator):
+            # estimators only read P(t|w) data, so they are shared
+            # by analyzers which use the same dictionary
+            return dictionary.get_shared(
+                ('prob_estimator', estimator_cls),
+                lambda: cls._create_prob_estimator(estimator_cls, dictionary, path)
+            )
+        return estimator_cls(path)
+
+    @classmethod
+    def _create_prob_estimator(cls, estimator_cls, dictionary, path):
+        # Subclasses which override __init__ may not accept
+        # the ``gramtab`` argument; they are created the old way.
+        init_owner = next(
+            klass for klass in estimator_cls.__mro__ if '__init__' in vars(klass)
+        )
+        if init_owner is ProbabilityEstimator:
+            return estimator_cls(path, gramtab=dictionary.gramtab)
         return estimator_cls(path)
 
     @classmethod
@@ -307,6 +607,12 @@ class MorphAnalyzer(object):
 
         (or plain tuples if ``result_type=None`` was used in constructor).
         """
+        cache = self._caches.get('parse')
+        if cache is not None:
+            return cached_list(cache, self._parse, word)
+        return self._parse(word)
+
+    def _parse(self, word):
         res = []
         seen = set()
         word_lower = word.lower()
@@ -326,6 +632,12 @@ class MorphAnalyzer(object):
         return [self._result_type(*p) for p in res]
 
     def tag(self, word):
+        cache = self._caches.get('tag')
+        if cache is not None:
+            return cached_list(cache, self._tag, word)
+        return self._tag(word)
+
+    def _tag(self, word):
         res = []
         seen = set()
         word_lower = word.lower()
@@ -344,6 +656,12 @@ class MorphAnalyzer(object):
         """
         Return a list of word normal forms.
         """
+        cache = self._caches.get('normal_forms')
+        if cache is not None:
+            return cached_list(cache, self._normal_forms, word)
+        return self._normal_forms(word)
+
+    def _normal_forms(self, word):
         seen = set()
         result = []
 
@@ -354,6 +672,59 @@ class MorphAnalyzer(object):
                 seen.add(normal_form)
         return result
 
+    def parse_many(self, words):
+        """
+        Analyze a sequence of words and return a list with
+        :meth:`parse` results for each word, in the same order.
+
+        Repeated words are analyzed only once, so for a natural text
+        (where the same words are used again and again) this is faster
+        than calling :meth:`parse` for each word.
+        """
+        return _map_distinct(self.parse, words)
+
+    def tag_many(self, words):
+        """
+        Return a list with :meth:`tag` results for each word in ``words``.
+        Repeated words are analyzed only once.
+        """
+        return _map_distinct(self.tag, words)
+
+    def normal_forms_many(self, words):
+        """
+        Return a list with :meth:`normal_forms` results for each word
+        in ``words``. Repeated words are analyzed only once.
+        """
+        return _map_distinct(self.normal_forms, words)
+
+    def parse_batch(self, words):
+        """
+        Analyze a sequence of words and return a
+        :class:`pymorphy2.batch.ParseBatch` object with results.
+        Results are stored column-wise (in arrays of tag ids,
+        scores, etc.), so this uses much less memory than
+        :meth:`parse_many` for large inputs.
+        """
+        return ParseBatch(self, words)
+
+    # ==== caching ========
+
+    def cache_info(self):
+        """
+        Return a dict with cache statistics for each cached method
+        (``{'parse': CacheInfo(...), 'tag': CacheInfo(...), ...}``);
+        the dict is empty if the analyzer was created without
+        ``cache_size`` argument.
+        """
+        return dict((name, cache.info()) for name, cache in self._caches.items())
+
+    def cache_clear(self):
+        """ Remove all cached results. """
+        for cache in self._caches.values():
+            cache.clear()
+        for unit, is_terminal in self._units:
+            unit.subword_cache_clear()
+
     # ==== inflection ========
 
     def get_lexeme(self, form):
@@ -369,6 +740,14 @@ class MorphAnalyzer(object):
         return [self._result_type(*p) for p in result]
 
     def _inflect(self, form, required_grammemes):
+        # some units (e.g. DictionaryAnalyzer) can inflect words
+        # without building a lexeme
+        result = form[4][-1][0].inflect(form, required_grammemes)
+        if result is not None:
+            if self._result_type is None:
+                return result
+            return [self._result_type(*p) for p in result]
+
         possible_results = [f for f in self.get_lexeme(form)
                             if required_grammemes <= f[1].grammemes]
 
@@ -439,6 +818,94 @@ class MorphAnalyzer(object):
         """ Return Cyrillic representation for ``tag_or_grammeme`` string """
         return self.TagClass.lat2cyr(tag_or_grammeme)
 
+    def prepare_for_fork(self, freeze=True):
+        """
+        Prepare the analyzer for sharing its memory with child processes
+        (e.g. gunicorn workers started with ``--preload`` option):
+        load all dictionary components and compute lazily computed tag
+        attributes.
+
+        If ``freeze`` is True, all objects created so far are also
+        moved out of garbage collector tracking (using ``gc.freeze``,
+        Python 3.7+). Otherwise GC passes in child processes write
+        to memory pages with dictionary objects, and these pages stop
+        being shared between processes (copy-on-write). Note that
+        ``gc.freeze`` affects the whole process, not only pymorphy2:
+        all objects which exist at this moment are never collected by
+        the cyclic garbage collector unless ``gc.unfreeze()`` is called.
+        Pass ``freeze=False`` to call ``gc.freeze`` yourself (or not at all).
+
+        Call this method right before forking;
+        see also :func:`pymorphy2.preload`.
+        """
+        self.dictionary.load_components()
+        for tag in self.dictionary.gramtab:
+            tag.grammemes
+            tag.grammemes_cyr
+            tag.cyr_repr
+
+        if freeze and hasattr(gc, 'freeze'):
+            gc.collect()
+            gc.freeze()
+
     def __reduce__(self):
-        args = (self._path, self._lang, self._result_type_orig, self._units_unbound)
-        return self.__class__, args, None
+        kwargs = dict(
+            path=self._path,
+            lang=self._lang,
+            result_type=self._result_type_orig,
+            units=self._units_unbound,
+            cache_size=self._cache_size,
+            use_mmap=self._use_mmap,
+            subword_cache_size=self._subword_cache_size,
+        )
+        return _create_morph_analyzer, (self.__class__, kwargs)
+
+
+# Analyzers created by preload(), keyed by dictionary;
+# they keep shared dictionaries loaded.
+_preloaded = {}
+
+
+def _preloaded_key(path, use_mmap):
+    return os.path.abspath(path), use_mmap
+
+
+def preload(path=None, lang=None, freeze=True, **kwargs):
+    """
+    Load a dictionary in the current process and prepare it for forking
+    (see :meth:`MorphAnalyzer.prepare_for_fork`, ``freeze`` argument
+    is passed to it); other arguments are the same as for
+    :class:`MorphAnalyzer`. Analyzers created later (e.g. in forked
+    worker processes) for the same dictionary reuse it.
+    Return the preloaded analyzer.
+
+    The dictionary is kept loaded until :func:`release_preloaded`
+    is called. If the dictionary is already preloaded, the previous
+    analyzer is replaced.
+    """
+    morph = MorphAnalyzer(path=path, lang=lang, **kwargs)
+    key = _preloaded_key(morph.dictionary.path, morph._use_mmap)
+    with MorphAnalyzer._lock:
+        _preloaded[key] = morph
+    morph.prepare_for_fork(freeze=freeze)
+    return morph
+
+
+def release_preloaded(path=None, lang=None, use_mmap=False):
+    """
+    Release an analyzer created by :func:`preload` for a dictionary
+    (all preloaded analyzers if both ``path`` and ``lang`` are None).
+    The dictionary is freed when it is no longer used by other
+    analyzers. Objects frozen by ``gc.freeze`` stay frozen.
+    """
+    with MorphAnalyzer._lock:
+        if path is None and lang is None:
+            _preloaded.clear()
+            return
+        path = MorphAnalyzer.choose_dictionary_path(path, lang)
+        _preloaded.pop(_preloaded_key(path, use_mmap), None)
+
+
+def _create_morph_analyzer(cls, kwargs):
+    """ Create MorphAnalyzer of class ``cls``; it is used for unpickling """
+    return cls(**kwargs)
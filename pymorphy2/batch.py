@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`pymorphy2.batch` provides a container which stores analysis
+results for many tokens column-wise, without per-parse Python objects.
+Use :meth:`pymorphy2.MorphAnalyzer.parse_batch` to create it.
+"""
+from __future__ import absolute_import, unicode_literals, division
+import array
+
+from pymorphy2.units.by_lookup import DictionaryAnalyzer
+
+
+class ParseBatch(object):
+    """
+    Parse results for a sequence of tokens.
+
+    Parses of token ``i`` are stored in rows
+    ``offsets[i]:offsets[i+1]`` of the following columns:
+
+    * ``tag_ids`` - tag ids; tag objects are ``tags[tag_id]``
+      (tags from the dictionary have the same ids as
+      in ``morph.dictionary.gramtab``);
+    * ``scores`` - parse scores;
+    * ``para_ids`` and ``idxs`` - paradigm id and form index
+      of the dictionary word the parse is based on
+      (-1 if the parse is not based on a dictionary paradigm).
+
+    Columns are ``array.array`` objects, so they can be converted
+    to NumPy arrays (e.g. ``numpy.asarray(batch.scores)``) and used
+    to create a pandas DataFrame (see :meth:`columns`).
+
+    :class:`pymorphy2.analyzer.Parse` objects of dictionary words
+    are not stored; they are created from the columns
+    by :meth:`get_parses`. Other parses (e.g. of unknown words)
+    can't be restored from the columns, so they are stored,
+    once for each distinct word.
+    """
+
+    def __init__(self, morph, words):
+        self._morph = morph
+        self.words = list(words)
+        self.offsets = array.array(str("I"), [0])
+        self.tag_ids = array.array(str("I"))
+        self.scores = array.array(str("d"))
+        self.para_ids = array.array(str("i"))
+        self.idxs = array.array(str("i"))
+        self.tags = list(morph.dictionary.gramtab)
+
+        # Parses which are not restored from columns are stored
+        # in ``_parses``; ``_parse_ids`` column has their indices
+        # (or -1 for parses of dictionary words).
+        self._parse_ids = array.array(str("i"))
+        self._parses = []
+        self._dict_unit = None
+
+        # Tags are interned, so they are looked up by identity.
+        # Tags which are not in the gramtab get new ids.
+        self._tag_ids = dict(morph.dictionary._tag_ids)
+        self._fill()
+
+    def _fill(self):
+        # Each distinct word is parsed once; its rows are stored as small
+        # arrays which are then copied to columns for each occurrence.
+        word_rows = {}
+        for word in self.words:
+            try:
+                rows = word_rows[word]
+            except KeyError:
+                rows = word_rows[word] = self._parse_rows(word)
+
+            self.tag_ids.extend(rows[0])
+            self.scores.extend(rows[1])
+            self.para_ids.extend(rows[2])
+            self.idxs.extend(rows[3])
+            self._parse_ids.extend(rows[4])
+            self.offsets.append(len(self.scores))
+
+    def _parse_rows(self, word):
+        rows = (
+            array.array(str("I")),
+            array.array(str("d")),
+            array.array(str("i")),
+            array.array(str("i")),
+            array.array(str("i")),
+        )
+        tag_ids = self._tag_ids
+        word_lower = word.lower()
+        for parse in self._morph.parse(word):
+            tag = parse[1]
+            tag_id = tag_ids.get(id(tag))
+            if tag_id is None:
+                tag_id = tag_ids[id(tag)] = len(self.tags)
+                self.tags.append(tag)
+
+            methods_stack = parse[4]
+            method = methods_stack[0]
+            if isinstance(method[0], DictionaryAnalyzer):
+                para_id, idx = method[2], method[3]
+            else:
+                para_id, idx = -1, -1
+
+            if self._is_dictionary_parse(methods_stack, word_lower):
+                parse_id = -1
+            else:
+                parse_id = len(self._parses)
+                self._parses.append(parse)
+
+            rows[0].append(tag_id)
+            rows[1].append(parse[3])
+            rows[2].append(para_id)
+            rows[3].append(idx)
+            rows[4].append(parse_id)
+        return rows
+
+    def _is_dictionary_parse(self, methods_stack, word_lower):
+        """
+        Return True if a parse with ``methods_stack`` can be restored
+        from the columns: it is a parse of a dictionary word
+        (without letter substitutions) made by the dictionary unit.
+        """
+        if len(methods_stack) != 1:
+            return False
+        unit, fixed_word = methods_stack[0][:2]
+        if fixed_word != word_lower or not isinstance(unit, DictionaryAnalyzer):
+            return False
+        if self._dict_unit is None:
+            self._dict_unit = unit
+        return unit is self._dict_unit
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index):
+        return self.get_parses(index)
+
+    def __iter__(self):
+        for index in range(len(self.words)):
+            yield self.get_parses(index)
+
+    def get_parses(self, index):
+        """
+        Return a list of parses for token ``index``
+        (the same as ``morph.parse(batch.words[index])``).
+        """
+        result_type = self._morph._result_type
+        dict_unit = self._dict_unit
+        word_lower = self.words[index].lower()
+
+        res = []
+        for row in range(self.offsets[index], self.offsets[index+1]):
+            parse_id = self._parse_ids[row]
+            if parse_id != -1:
+                res.append(self._parses[parse_id])
+                continue
+
+            tag = self.tags[self.tag_ids[row]]
+            score = self.scores[row]
+            para_id, idx = self.para_ids[row], self.idxs[row]
+            method = (dict_unit, word_lower, para_id, idx)
+            if dict_unit.lazy_normal_forms:
+                res.append(result_type(word_lower, tag, None, score, method))
+                continue
+
+            normal_form = dict_unit.dict.build_normal_form(para_id, idx, word_lower)
+            parse = (word_lower, tag, normal_form, score, (method,))
+            res.append(parse if result_type is None else result_type(*parse))
+        return res
+
+    def get_tags(self, index):
+        """ Return a list of tags for token ``index``. """
+        start, end = self.offsets[index], self.offsets[index+1]
+        return [self.tags[tag_id] for tag_id in self.tag_ids[start:end]]
+
+    def get_scores(self, index):
+        """ Return a list of parse scores for token ``index``. """
+        return self.scores[self.offsets[index]:self.offsets[index+1]].tolist()
+
+    def token_ids(self):
+        """ Return an array with a token index for each row. """
+        res = array.array(str("I"))
+        for index in range(len(self.words)):
+            res.extend([index] * (self.offsets[index+1] - self.offsets[index]))
+        return res
+
+    def columns(self):
+        """
+        Return a dict with row columns; it can be passed
+        to ``pandas.DataFrame`` constructor.
+        """
+        return {
+            'token_id': self.token_ids(),
+            'tag_id': self.tag_ids,
+            'score': self.scores,
+            'para_id': self.para_ids,
+            'idx': self.idxs,
+        }
+
+    def __repr__(self):
+        return str("<%s: %d tokens, %d parses>") % (
+            self.__class__.__name__, len(self.words), len(self.scores)
+        )
@@ -6,10 +6,13 @@ This module exposes lru_cache decorator, trying import it from
 * functools.lru_cache in standard library;
 * https://pypi.python.org/pypi/backports.functools_lru_cache
 
-Also, it provides a caching decorator for functions with a single argument.
+Also, it provides a caching decorator for functions with a single argument
+and a thread-safe LRU cache with usage statistics.
 """
 from __future__ import absolute_import
+import collections
 import functools
+import threading
 
 try:
     from fastcache import clru_cache as lru_cache
@@ -47,3 +50,93 @@ def memoized_with_single_argument(cache):
             return res
         return wrapper
     return decorator
+
+
+def cached_list(cache, func, word):
+    """
+    Return ``func(word)`` (a list), taking the result from ``cache``
+    (an :class:`LRUCache`) when possible. Results are stored as tuples;
+    callers get a fresh list each time.
+
+    >>> cache = LRUCache(10)
+    >>> res = cached_list(cache, lambda word: [word, word], 'a')
+    >>> res.append('b')
+    >>> cached_list(cache, lambda word: [], 'a')
+    ['a', 'a']
+    """
+    res = cache.get(word)
+    if res is None:
+        res = tuple(func(word))
+        cache.put(word, res)
+    return list(res)
+
+
+CacheInfo = collections.namedtuple('CacheInfo', 'hits misses evictions maxsize currsize')
+
+
+class LRUCache(object):
+    """
+    Thread-safe mapping with a bounded size; least recently used
+    entries are evicted when the cache is full.
+
+    >>> cache = LRUCache(2)
+    >>> cache.put('a', 1)
+    >>> cache.put('b', 2)
+    >>> cache.get('a')
+    1
+    >>> cache.put('c', 3)
+    >>> cache.get('b') is None
+    True
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, evictions=1, maxsize=2, currsize=2)
+    """
+    def __init__(self, maxsize):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Return a value for the ``key`` (or ``default`` if the key
+        is not in the cache) and mark the key as recently used.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """ Add a value to the cache, evicting the oldest entry if needed. """
+        with self._lock:
+            data = self._data
+            if key in data:
+                del data[key]
+            elif len(data) >= self.maxsize:
+                data.popitem(last=False)
+                self.evictions += 1
+            data[key] = value
+
+    def clear(self):
+        """ Remove all entries and reset statistics. """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """ Return cache statistics as a :class:`CacheInfo` namedtuple. """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self.maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
@@ -7,6 +7,8 @@ import logging
 import time
 import codecs
 import operator
+import functools
+import json
 
 import pymorphy2
 from pymorphy2.cache import lru_cache, memoized_with_single_argument
@@ -27,6 +29,9 @@ Usage::
     pymorphy parse [options] [<input>]
     pymorphy dict meta [--lang <lang> | --dict <path>]
     pymorphy dict mem_usage [--lang <lang> | --dict <path>] [--verbose]
+    pymorphy dict build_tables [--lang <lang> | --dict <path>] [--verbose]
+    pymorphy dict build_prediction_index [--lang <lang> | --dict <path>] [--verbose]
+    pymorphy dict build_word_probabilities [--lang <lang> | --dict <path>] [--verbose]
     pymorphy -h | --help
     pymorphy --version
 
@@ -39,6 +44,12 @@ Options::
                         than a threshold [default: 0.0]
     --tokenized         Assume that input text is already tokenized:
                         one token per line.
+    -f --format <format>  Result format. Allowed values: text, json, jsonl,
+                        tsv [default: text]
+    -j --jobs <NUM>     Number of worker processes; use 0 to start
+                        a process per CPU [default: 1]
+    --batch-size <NUM>  Number of input lines processed and written
+                        at once [default: 1000]
     -c --cache <SIZE>   Cache size, in entries. Set it to 0 to disable
                         cache; use 'unlim' value for unlimited cache
                         size [default: 20000]
@@ -52,12 +63,13 @@ DOC = head + __doc__.replace('::\n', ':')
 
 # TODO:
 #   -i --inline         Don't start each output result with a new line
-#   --format <format>   Result format. Allowed values: text, json [default: text]
 #   --nonlex            Parse non-lexical tokens
 
 
 logger = logging.getLogger('pymorphy2')
 
+OUTPUT_FORMATS = ['text', 'json', 'jsonl', 'tsv']
+
 
 # ============================== Entry point ============================
 def main(argv=None):
@@ -65,13 +77,18 @@ def main(argv=None):
     Pymorphy CLI interface dispatcher.
     """
 
-    from docopt import docopt
-    args = docopt(DOC, argv, version=pymorphy2.__version__)
+    import docopt
+    args = docopt.docopt(DOC, argv, version=pymorphy2.__version__)
 
     path = args['--dict']
     lang = args['--lang']
 
     if args['parse']:
+        if args['--format'] not in OUTPUT_FORMATS:
+            raise docopt.DocoptExit("Unsupported output format: %s" % args['--format'])
+        jobs = _int_option(args, '--jobs', 0)
+        batch_size = _int_option(args, '--batch-size', 1)
+
         morph = pymorphy2.MorphAnalyzer(path=path, lang=lang)
         in_file = _open_for_read(args['<input>'])
 
@@ -96,6 +113,9 @@ def main(argv=None):
             newlines=True,  # not args['--inline'],
             cache_size=args['--cache'],
             thresh=float(args['--thresh']),
+            jobs=jobs or None,
+            batch_size=batch_size,
+            output_format=args['--format'],
         )
 
     if args['dict']:
@@ -107,6 +127,25 @@ def main(argv=None):
             return show_dict_mem_usage(lang, path, args['--verbose'])
         elif args['meta']:
             return show_dict_meta(lang, path)
+        elif args['build_tables']:
+            return build_dict_tables(lang, path)
+        elif args['build_prediction_index']:
+            return build_dict_prediction_index(lang, path)
+        elif args['build_word_probabilities']:
+            return build_dict_word_probabilities(lang, path)
+
+
+def _int_option(args, name, min_value):
+    """ Return a value of an integer option; exit with usage if it is invalid """
+    import docopt
+    try:
+        value = int(args[name])
+    except ValueError:
+        value = None
+    if value is None or value < min_value:
+        raise docopt.DocoptExit("%s must be an integer >= %d, got %r" % (
+            name, min_value, args[name]))
+    return value
 
 
 def _open_for_read(fn):
@@ -126,19 +165,44 @@ def _open_for_read(fn):
 
 def show_dict_mem_usage(lang, dict_path=None, verbose=False):
     """
-    Show dictionary memory usage.
+    Show dictionary memory usage. Memory used by a dictionary-only
+    analyzer is reported separately; lazy dictionary components
+    it doesn't need are then loaded one by one.
     """
+    from pymorphy2.units import DictionaryAnalyzer
+
     initial_mem = get_mem_usage()
     initial_time = time.time()
 
-    morph = pymorphy2.MorphAnalyzer(path=dict_path, lang=lang)
+    morph = pymorphy2.MorphAnalyzer(path=dict_path, lang=lang,
+                                    units=[DictionaryAnalyzer()])
 
     end_time = time.time()
     mem_usage = get_mem_usage()
 
+    logger.info(
+        'Memory usage: %0.1fM dictionary-only analyzer (load time %0.2fs)',
+        (mem_usage-initial_mem)/(1024*1024), end_time-initial_time
+    )
+
+    loaded = morph.dictionary.loaded_components()
+    for name in morph.dictionary.LAZY_COMPONENTS:
+        if name in loaded:
+            continue
+        component_mem = get_mem_usage()
+        component_time = time.time()
+        morph.dictionary.load_components([name])
+        logger.info(
+            'Memory usage: %0.1fM %s (load time %0.2fs)',
+            (get_mem_usage()-component_mem)/(1024*1024), name,
+            time.time()-component_time
+        )
+
+    mem_usage = get_mem_usage()
     logger.info(
         'Memory usage: %0.1fM dictionary, %0.1fM total (load time %0.2fs)',
-        (mem_usage-initial_mem)/(1024*1024), mem_usage/(1024*1024), end_time-initial_time
+        (mem_usage-initial_mem)/(1024*1024), mem_usage/(1024*1024),
+        time.time()-initial_time
     )
 
 
@@ -149,8 +213,39 @@ def show_dict_meta(lang, dict_path=None):
         logger.info("%s: %s", key, value)
 
 
+def build_dict_tables(lang, dict_path=None):
+    """
+    Create a file which allows to load the dictionary using mmap.
+    """
+    from pymorphy2.opencorpora_dict.storage import build_tables
+    path = pymorphy2.MorphAnalyzer.choose_dictionary_path(dict_path, lang)
+    logger.info("Creating tables for %s", path)
+    build_tables(path)
+
+
+def build_dict_prediction_index(lang, dict_path=None):
+    """
+    Create a merged prediction index file for the dictionary.
+    """
+    from pymorphy2.opencorpora_dict.storage import build_prediction_index
+    path = pymorphy2.MorphAnalyzer.choose_dictionary_path(dict_path, lang)
+    logger.info("Creating prediction index for %s", path)
+    build_prediction_index(path)
+
+
+def build_dict_word_probabilities(lang, dict_path=None):
+    """
+    Create a P(t|w) file keyed by word for the dictionary.
+    """
+    from pymorphy2.opencorpora_dict.probability import convert_cpd_dawg
+    path = pymorphy2.MorphAnalyzer.choose_dictionary_path(dict_path, lang)
+    logger.info("Creating P(t|w) data keyed by word for %s", path)
+    convert_cpd_dawg(path)
+
+
 def parse(morph, in_file, out_file, tokenize, score, normal_form, tag,
-          newlines, cache_size, thresh):
+          newlines, cache_size, thresh, jobs=1, batch_size=1000,
+          output_format='text'):
     """
     Parse text from in_file; write output to out_file.
     Both ``in_file`` and ``out_file`` must support unicode.
@@ -163,8 +258,51 @@ def parse(morph, in_file, out_file, tokenize, score, normal_form, tag,
     * If `newline` is True, write each result on a new line.
     * `cache_size` is a maximum number of entries in internal cache.
     * `thresh` is a minimum allowed parse score
+    * `jobs` is a number of worker processes (None means a process per CPU).
+    * `batch_size` is a number of input lines processed and written at once.
+    * `output_format` is one of 'text', 'json', 'jsonl' or 'tsv'.
+
+    """
+    from pymorphy2 import parallel
+
+    options = (tokenize, score, normal_form, tag, newlines, cache_size, thresh,
+               output_format)
+    blocks = parallel._iter_chunks(in_file, batch_size)
 
+    if jobs == 1:
+        parse_lines = _get_lines_parser(morph, options)
+        results = (parse_lines(lines) for lines in blocks)
+    else:
+        # each worker process creates its own parser (with its own cache)
+        results = parallel.map_chunks(
+            functools.partial(_parse_lines_in_worker, options),
+            blocks, morph, jobs
+        )
+
+    # 'json' output is a single list; its items are separated by
+    # `sep`, including items from different blocks.
+    head, sep, tail = _TokenParserFormatter.output_frames.get(output_format, ("", "", ""))
+
+    _write = out_file.write
+    _write(head)
+    is_first = True
+    for res in results:
+        if not res:
+            continue
+        if not is_first:
+            _write(sep)
+        _write(res)
+        is_first = False
+    _write(tail)
+
+
+def _get_lines_parser(morph, options):
+    """
+    Return a function which parses a list of input lines
+    and returns formatted results as a single string.
     """
+    (tokenize, score, normal_form, tag, newlines, cache_size, thresh,
+     output_format) = options
     iter_tokens = _iter_tokens_tokenize if tokenize else _iter_tokens_notokenize
 
     parser = _TokenParserFormatter(
@@ -174,6 +312,7 @@ def parse(morph, in_file, out_file, tokenize, score, normal_form, tag,
         tag=tag,
         newlines=newlines,
         thresh=thresh,
+        output_format=output_format,
     )
 
     _parse = parser.parse
@@ -183,10 +322,25 @@ def parse(morph, in_file, out_file, tokenize, score, normal_form, tag,
         cache_size = int(cache_size)
         if cache_size:
             _parse = lru_cache(cache_size)(_parse)
-    _write = out_file.write
 
-    for token in iter_tokens(in_file):
-        _write(_parse(token))
+    join = parser.token_sep.join
+
+    def parse_lines(lines):
+        return join([_parse(token) for token in iter_tokens(lines)])
+
+    return parse_lines
+
+
+# lines parsers of a worker process, by options
+_worker_lines_parsers = {}
+
+
+def _parse_lines_in_worker(options, morph, lines):
+    try:
+        parse_lines = _worker_lines_parsers[options]
+    except KeyError:
+        parse_lines = _worker_lines_parsers[options] = _get_lines_parser(morph, options)
+    return parse_lines(lines)
 
 
 class _TokenParserFormatter(object):
@@ -199,7 +353,16 @@ class _TokenParserFormatter(object):
     tpl_no_newline = "%s{%s} "
     or_sep = "|"
 
-    def __init__(self, morph, score, normal_form, tag, newlines, thresh):
+    # a separator between results for different tokens
+    token_sep = ""
+
+    # (head, separator, tail) for output formats which need them
+    output_frames = {
+        'json': ("[\n", ",\n", "\n]\n"),
+    }
+
+    def __init__(self, morph, score, normal_form, tag, newlines, thresh,
+                 output_format='text'):
         tpl = self.tpl_newline if newlines else self.tpl_no_newline
         morph_tag = morph.tag
         morph_parse = morph.parse
@@ -208,6 +371,11 @@ class _TokenParserFormatter(object):
         if not normal_form and not tag:
             raise ValueError("Empty output is requested")
 
+        if output_format != 'text':
+            self._init_structured(morph, score, normal_form, tag, thresh,
+                                  output_format)
+            return
+
         if not normal_form and not score and not thresh:
             # morph.tag method is enough
             self.parse = lambda tok: tpl % (tok, join(str(t) for t in morph_tag(tok)))
@@ -230,16 +398,8 @@ class _TokenParserFormatter(object):
                         ]
                         return tpl % (tok, join(seq))
             else:
-                val = operator.itemgetter(1)
                 def _parse_token(tok):
-                    lemmas = {}
-                    for p in morph_parse(tok):
-                        lemmas[p.normal_form] = lemmas.get(p.normal_form, 0) + p.score
-
-                    items = sorted(
-                        [(lemma, w) for (lemma, w) in lemmas.items() if w >= thresh],
-                        key=val, reverse=True
-                    )
+                    items = _lemma_scores(morph_parse(tok), thresh)
                     if score:
                         seq = ["%s:%0.3f" % (lemma, w) for (lemma, w) in items]
                     else:
@@ -264,6 +424,100 @@ class _TokenParserFormatter(object):
 
         self.parse = _parse_token
 
+    def _init_structured(self, morph, score, normal_form, tag, thresh,
+                         output_format):
+        """
+        Define `parse` method for machine-readable output formats.
+        Each token result is a list of ``(normal_form, score, tag)``
+        records; only requested fields are written.
+        """
+        morph_parse = morph.parse
+        morph_tag = morph.tag
+        record = operator.itemgetter(2, 3, 1)
+
+        if not normal_form and not score and not thresh:
+            # morph.tag method is enough
+            get_records = lambda tok: [(None, None, t) for t in morph_tag(tok)]
+        elif normal_form and not tag:
+            get_records = lambda tok: [
+                (lemma, w, None)
+                for (lemma, w) in _lemma_scores(morph_parse(tok), thresh)
+            ]
+        else:
+            get_records = lambda tok: [
+                record(p) for p in morph_parse(tok) if p.score >= thresh
+            ]
+
+        fields = [
+            (name, idx) for (name, idx, enabled) in [
+                ('normal_form', 0, normal_form),
+                ('score', 1, score),
+                ('tag', 2, tag),
+            ] if enabled
+        ]
+
+        if output_format == 'tsv':
+            encoders = [(idx, _tsv_encoders[name]) for (name, idx) in fields]
+            empty_row = "%s" + "\t" * len(fields) + "\n"
+
+            def _parse_token(tok):
+                rows = [
+                    "%s\t%s\n" % (tok, "\t".join([enc(rec[idx]) for (idx, enc) in encoders]))
+                    for rec in get_records(tok)
+                ]
+                return "".join(rows) if rows else empty_row % tok
+
+        else:
+            encoders = [(idx, _json_encoders[name]) for (name, idx) in fields]
+            rec_tpl = "{%s}" % ", ".join('"%s": %%s' % name for (name, idx) in fields)
+            tpl = '{"word": %s, "parses": [%s]}'
+            if output_format == 'jsonl':
+                tpl += "\n"
+            else:
+                self.token_sep = self.output_frames['json'][1]
+
+            def _parse_token(tok):
+                seq = [
+                    rec_tpl % tuple([enc(rec[idx]) for (idx, enc) in encoders])
+                    for rec in get_records(tok)
+                ]
+                return tpl % (_json_str(tok), ", ".join(seq))
+
+        self.parse = _parse_token
+
+
+def _lemma_scores(parses, thresh):
+    """
+    Return a list of ``(normal_form, score)`` tuples for parses,
+    sorted by score; scores of parses with the same normal form
+    are summed up.
+    """
+    lemmas = {}
+    for p in parses:
+        lemmas[p.normal_form] = lemmas.get(p.normal_form, 0) + p.score
+
+    return sorted(
+        [(lemma, w) for (lemma, w) in lemmas.items() if w >= thresh],
+        key=operator.itemgetter(1), reverse=True
+    )
+
+
+def _json_str(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+_json_encoders = {
+    'normal_form': _json_str,
+    'score': repr,
+    'tag': lambda tag: '"%s"' % tag,  # tags don't need escaping
+}
+
+_tsv_encoders = {
+    'normal_form': lambda normal_form: normal_form,
+    'score': repr,
+    'tag': str,
+}
+
 
 def _iter_tokens_tokenize(fp):
     """ Return an iterator of input tokens; each line is tokenized """
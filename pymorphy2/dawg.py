@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, division
+import itertools
 
 try:
     from dawg import DAWG, RecordDAWG, IntCompletionDAWG
@@ -46,6 +47,21 @@ class PredictionSuffixesDAWG(WordsDawg):
     DATA_FORMAT = str(">HHH")
 
 
+class PredictionSuffixesIndexDAWG(WordsDawg):
+    """
+    DAWG for storing prediction data for all paradigm prefixes at once.
+    Keys are reversed word endings, so all endings of a word
+    can be found in a single walk using ``.prefixes()`` method.
+    """
+
+    # We are storing the paradigm prefix ID as an unsigned byte,
+    # 2 padding bytes and 3 unsigned short ints: count,
+    # the paradigm ID and the form index.
+    # Byte order is big-endian (this makes values sorted
+    # by paradigm prefix first).
+    DATA_FORMAT = str(">BxxHHH")
+
+
 class ConditionalProbDistDAWG(IntCompletionDAWG):
 
     MULTIPLIER = 1000000
@@ -66,6 +82,58 @@ class ConditionalProbDistDAWG(IntCompletionDAWG):
         return self.get(dawg_key, 0) / self.MULTIPLIER
 
 
+class ConditionalProbDistRecordDAWG(RecordDAWG):
+    """
+    DAWG for storing P(t|w) estimates of all tags of a word
+    under a single key (the word).
+    """
+
+    # We are storing (tag id, probability * MULTIPLIER) pairs as values;
+    # tag id is an index of the tag in dictionary gramtab.
+    DATA_FORMAT = str(">HI")
+    MULTIPLIER = 1000000
+
+    # Tags which are not in the gramtab (e.g. ROMN or LATN) get ids
+    # starting from len(gramtab); ``TAG_KEY_PREFIX + tag`` keys
+    # store them as (tag id, 0) values.
+    TAG_KEY_PREFIX = "\x02"
+
+    def __init__(self, data=None, extra_tag_ids=None):
+        if data is None:
+            super(ConditionalProbDistRecordDAWG, self).__init__(self.DATA_FORMAT)
+        else:
+            assert_can_create()
+            dawg_data = itertools.chain(
+                (
+                    (word, (tag_id, int(prob*self.MULTIPLIER)))
+                    for (word, tag_id), prob in data
+                ),
+                (
+                    (self.TAG_KEY_PREFIX + tag, (tag_id, 0))
+                    for tag, tag_id in (extra_tag_ids or {}).items()
+                )
+            )
+            super(ConditionalProbDistRecordDAWG, self).__init__(self.DATA_FORMAT, dawg_data)
+
+    def probs(self, word):
+        """ Return a ``{tag_id: probability}`` dict for a ``word``. """
+        return dict(
+            (tag_id, prob / self.MULTIPLIER)
+            for tag_id, prob in self.get(word, ())
+        )
+
+    def extra_tag_ids(self):
+        """
+        Return a ``{tag string: tag id}`` dict for tags
+        which are not in the gramtab.
+        """
+        prefix = self.TAG_KEY_PREFIX
+        return dict(
+            (key[len(prefix):], tag_id)
+            for key, (tag_id, _) in self.items(prefix)
+        )
+
+
 class DawgPrefixMatcher(DAWG):
     def is_prefixed(self, word):
         return bool(self.prefixes(word))
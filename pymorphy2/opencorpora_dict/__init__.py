@@ -3,4 +3,4 @@ from __future__ import absolute_import
 
 from .storage import load_dict as load
 from .compile import convert_to_pymorphy2
-from .wrapper import Dictionary
+from .wrapper import Dictionary, get_dictionary, release_dictionary
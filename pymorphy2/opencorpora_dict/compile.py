@@ -29,7 +29,8 @@ logger = logging.getLogger(__name__)
 
 CompiledDictionary = collections.namedtuple(
     'CompiledDictionary',
-    'gramtab suffixes paradigms words_dawg prediction_suffixes_dawgs parsed_dict compile_options'
+    'gramtab suffixes paradigms words_dawg prediction_suffixes_dawgs '
+    'prediction_suffixes_index parsed_dict compile_options'
 )
 
 _pick_second_item = operator.itemgetter(1)
@@ -67,6 +68,10 @@ def compile_parsed_dict(parsed_dict, compile_options=None):
         min_ending_freq=2,
         min_paradigm_popularity=3,
         max_suffix_length=5,
+        # merged prediction index is optional (see
+        # KnownSuffixAnalyzer.use_prediction_index); it can also be built
+        # later by ``pymorphy dict build_prediction_index``
+        build_prediction_index=False,
     )
     options.update(compile_options or {})
     paradigm_prefixes = options["paradigm_prefixes"]
@@ -168,12 +173,20 @@ def compile_parsed_dict(parsed_dict, compile_options=None):
         logger.debug('building prediction_suffixes DAFSA #%d' % prefix_id)
         prediction_suffixes_dawgs.append(dawg.PredictionSuffixesDAWG(dawg_data))
 
+    prediction_suffixes_index = None
+    if options["build_prediction_index"]:
+        logger.debug('building prediction_suffixes index DAFSA')
+        prediction_suffixes_index = dawg.PredictionSuffixesIndexDAWG(
+            _prediction_index_data(suffixes_dawgs_data)
+        )
+
     return CompiledDictionary(
         gramtab=tuple(gramtab),
         suffixes=suffixes,
         paradigms=paradigms,
         words_dawg=words_dawg,
         prediction_suffixes_dawgs=prediction_suffixes_dawgs,
+        prediction_suffixes_index=prediction_suffixes_index,
         parsed_dict=parsed_dict,
         compile_options=options,
     )
@@ -334,6 +347,17 @@ def _suffixes_prediction_data(words, paradigm_popularity, gramtab, paradigms, su
     return dawgs_data
 
 
+def _prediction_index_data(dawgs_data):
+    """
+    Merge prediction data for all paradigm prefixes (as returned by
+    :func:`_suffixes_prediction_data`) into data for a single DAWG
+    keyed by reversed word endings.
+    """
+    for prefix_id, dawg_data in enumerate(dawgs_data):
+        for ending, record in dawg_data:
+            yield ending[::-1], (prefix_id,) + record
+
+
 def _get_suffixes_dawg_data(endings, ending_counts, min_ending_freq):
     counted_suffixes_dawg_data = []
 
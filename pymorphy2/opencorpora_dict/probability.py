@@ -10,8 +10,9 @@ from __future__ import absolute_import
 import os
 import logging
 from pymorphy2 import MorphAnalyzer
+from pymorphy2.analyzer import CPD_RECORD_DAWG_FILENAME
 from pymorphy2.opencorpora_dict.preprocess import tag2grammemes
-from pymorphy2.dawg import ConditionalProbDistDAWG
+from pymorphy2.dawg import ConditionalProbDistDAWG, ConditionalProbDistRecordDAWG
 from pymorphy2.opencorpora_dict.storage import update_meta
 from pymorphy2.utils import with_progress
 
@@ -34,6 +35,10 @@ def add_conditional_tag_probability(corpus_filename, out_path, min_word_freq,
     dawg_filename = os.path.join(out_path, 'p_t_given_w.intdawg')
     d.save(dawg_filename)
 
+    logger.info("Encoding P(t|w) as DAWG keyed by word")
+    d = build_cpd_record_dawg(morph, cpd, int(min_word_freq))
+    d.save(os.path.join(out_path, CPD_RECORD_DAWG_FILENAME))
+
     logger.info("Updating meta information")
     meta_filename = os.path.join(out_path, 'meta.json')
     update_meta(meta_filename, [
@@ -104,6 +109,71 @@ def build_cpd_dawg(morph, cpd, min_word_freq):
     For each "interesting" word and tag the resulting DAWG
     stores ``"word:tag"`` key with ``probability*1000000`` integer value.
     """
+    return ConditionalProbDistDAWG(_cpd_data(morph, cpd, min_word_freq))
+
+
+def build_cpd_record_dawg(morph, cpd, min_word_freq):
+    """
+    Return conditional tag probability information encoded as
+    :class:`pymorphy2.dawg.ConditionalProbDistRecordDAWG`.
+
+    For each "interesting" word the resulting DAWG stores
+    ``(tag id, probability*1000000)`` pairs under the ``"word"`` key;
+    tag id is an index of the tag in ``morph.dictionary.gramtab``
+    (tags which are not in the gramtab get extra ids).
+    """
+    return _record_dawg(morph.dictionary.gramtab, (
+        ((word, str(tag)), prob)
+        for (word, tag), prob in _cpd_data(morph, cpd, min_word_freq)
+    ))
+
+
+def convert_cpd_dawg(path, morph=None):
+    """
+    Create P(t|w) data keyed by word for a dictionary in ``path`` folder
+    from its ``p_t_given_w.intdawg`` file. This is needed for
+    dictionaries compiled without this data; the DAWG extension
+    is required.
+    """
+    if morph is None:
+        morph = MorphAnalyzer(path, probability_estimator_cls=None)
+
+    cpd_dawg = ConditionalProbDistDAWG().load(os.path.join(path, 'p_t_given_w.intdawg'))
+    multiplier = ConditionalProbDistDAWG.MULTIPLIER
+
+    dawg_data = []
+    for key, value in cpd_dawg.iteritems():
+        word, _, tag = key.rpartition(':')
+        # +0.5 makes sure value is not changed by float rounding
+        # when it is quantized again
+        dawg_data.append(((word, tag), (value + 0.5) / multiplier))
+
+    d = _record_dawg(morph.dictionary.gramtab, dawg_data)
+    d.save(os.path.join(path, CPD_RECORD_DAWG_FILENAME))
+
+
+def _record_dawg(gramtab, data):
+    """
+    Return :class:`ConditionalProbDistRecordDAWG` for
+    ``((word, tag string), prob)`` records. Tags which are not
+    in the gramtab get ids starting from ``len(gramtab)``.
+    """
+    tag_ids = _gramtab_tag_ids(gramtab)
+    extra_tag_ids = {}
+
+    def _tag_id(tag):
+        tag_id = tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = extra_tag_ids.get(tag)
+            if tag_id is None:
+                tag_id = extra_tag_ids[tag] = len(gramtab) + len(extra_tag_ids)
+        return tag_id
+
+    dawg_data = [((word, _tag_id(tag)), prob) for (word, tag), prob in data]
+    return ConditionalProbDistRecordDAWG(dawg_data, extra_tag_ids)
+
+
+def _cpd_data(morph, cpd, min_word_freq):
     words = [word for (word, fd) in cpd.items()
              if fd.freqdist().N() >= min_word_freq]
 
@@ -111,12 +181,19 @@ def build_cpd_dawg(morph, cpd, min_word_freq):
         lambda rec: not _all_the_same(rec[1]),
         ((word, _tag_probabilities(morph, word, cpd)) for word in words)
     )
-    dawg_data = (
+    return (
         ((word, tag), prob)
         for word, probs in prob_data
         for tag, prob in probs.items()
     )
-    return ConditionalProbDistDAWG(dawg_data)
+
+
+def _gramtab_tag_ids(gramtab):
+    """ Return a dict which maps tag strings to their gramtab ids. """
+    tag_ids = {}
+    for tag_id, tag in enumerate(gramtab):
+        tag_ids.setdefault(str(tag), tag_id)
+    return tag_ids
 
 
 def _disambiguated_words(reader):
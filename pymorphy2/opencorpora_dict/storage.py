@@ -4,13 +4,18 @@
 module for saving and loading pymorphy2 dictionaries.
 """
 from __future__ import absolute_import, unicode_literals
+import codecs
 import datetime
 import os
+import sys
 import logging
 import collections
 import itertools
 import array
 import struct
+import json
+import mmap
+import warnings
 
 try:
     izip = itertools.izip
@@ -24,8 +29,21 @@ from pymorphy2.utils import json_write, json_read
 
 logger = logging.getLogger(__name__)
 
+_utf_8_decode = codecs.utf_8_decode
+
 CURRENT_FORMAT_VERSION = '2.4'
 
+# A file with paradigms, suffixes and gramtabs stored as flat arrays;
+# it allows to load these tables using mmap.
+TABLES_FILENAME = 'tables.bin'
+TABLES_FORMAT_VERSION = 1
+_TABLES_MAGIC = b'PYMORPHY2-TABLES'
+_FORM_TABLES_SECTIONS = ['forms-offsets', 'forms-suffix-ids',
+                         'forms-tag-ids', 'forms-prefix-ids']
+
+# Prediction data for all paradigm prefixes, keyed by reversed word endings.
+PREDICTION_INDEX_FILENAME = 'prediction-suffixes-index.dawg'
+
 LoadedDictionary = collections.namedtuple('LoadedDictionary', [
     'meta',
     'gramtab',
@@ -35,13 +53,29 @@ LoadedDictionary = collections.namedtuple('LoadedDictionary', [
     'prediction_suffixes_dawgs',
     'Tag',
     'paradigm_prefixes',
+    'form_tables',
 ])
 
 
-def load_dict(path, gramtab_format='opencorpora-int'):
+def load_dict(path, gramtab_format='opencorpora-int', use_mmap=False,
+              lazy=False):
     """
     Load pymorphy2 dictionary.
     ``path`` is a folder name with dictionary data.
+
+    If ``use_mmap`` is True, paradigms, suffixes and gramtab
+    are read from a memory-mapped ``tables.bin`` file, so that OS page
+    cache is shared between processes which use the same dictionary.
+    Create this file using :func:`build_tables` (or
+    ``pymorphy dict build_tables`` command) if dictionary doesn't have it.
+
+    If ``lazy`` is True, ``words`` and ``prediction_suffixes_dawgs``
+    are not loaded (they are None in the result); use :func:`load_words`
+    and :func:`load_prediction_suffixes_dawgs` to load them.
+
+    ``form_tables`` of the result are per-form id arrays (see
+    :func:`build_form_tables`) read from ``tables.bin``, or None if they
+    are not available there.
     """
 
     _f = lambda p: os.path.join(path, p)
@@ -51,12 +85,38 @@ def load_dict(path, gramtab_format='opencorpora-int'):
 
     Tag = _load_tag_class(gramtab_format, _f('grammemes.json'))
 
-    str_gramtab = _load_gramtab(meta, gramtab_format, path)
-    gramtab = [Tag(tag_str) for tag_str in str_gramtab]
+    tables = None
+    if use_mmap:
+        if os.path.exists(_f(TABLES_FILENAME)):
+            tables = _load_tables(_f(TABLES_FILENAME), use_mmap=True)
+        else:
+            warnings.warn(
+                "%s is not found in %s; loading the dictionary without mmap. "
+                "Use 'pymorphy dict build_tables' command to create it." % (
+                    TABLES_FILENAME, path)
+            )
+
+    form_tables = None
+    if tables is not None:
+        gramtab_name = 'gramtab-%s' % gramtab_format
+        if gramtab_name + '-offsets' not in tables:
+            raise ValueError("This gramtab format (%s) is unavailable in %s" % (
+                gramtab_format, TABLES_FILENAME))
+        str_gramtab = StringTable(tables[gramtab_name + '-offsets'],
+                                  tables[gramtab_name + '-data'])
+        suffixes = StringTable(tables['suffixes-offsets'], tables['suffixes-data'])
+        paradigms = FlatParadigms.from_offsets(tables['paradigms-offsets'],
+                                               tables['paradigms-data'])
+        if all(name in tables for name in _FORM_TABLES_SECTIONS):
+            # tables.bin files created by older pymorphy2 versions
+            # don't have these sections
+            form_tables = tuple(tables[name] for name in _FORM_TABLES_SECTIONS)
+    else:
+        str_gramtab = _load_gramtab(meta, gramtab_format, path)
+        suffixes = json_read(_f('suffixes.json'))
+        paradigms = _load_paradigms(_f('paradigms.array'))
 
-    suffixes = json_read(_f('suffixes.json'))
-    paradigms = _load_paradigms(_f('paradigms.array'))
-    words = dawg.WordsDawg().load(_f('words.dawg'))
+    gramtab = [Tag(tag_str) for tag_str in str_gramtab]
 
     try:
         paradigm_prefixes = meta["compile_options"]["paradigm_prefixes"]
@@ -64,11 +124,12 @@ def load_dict(path, gramtab_format='opencorpora-int'):
         # support dicts v2.4
         paradigm_prefixes = json_read(_f('paradigm-prefixes.json'))
 
-    prediction_suffixes_dawgs = []
-    for prefix_id in range(len(paradigm_prefixes)):
-        fn = _f('prediction-suffixes-%s.dawg' % prefix_id)
-        assert os.path.exists(fn)
-        prediction_suffixes_dawgs.append(dawg.PredictionSuffixesDAWG().load(fn))
+    if lazy:
+        words, prediction_suffixes_dawgs = None, None
+    else:
+        words = load_words(path)
+        prediction_suffixes_dawgs = load_prediction_suffixes_dawgs(
+            path, paradigm_prefixes)
 
     return LoadedDictionary(
         meta=meta,
@@ -79,9 +140,28 @@ def load_dict(path, gramtab_format='opencorpora-int'):
         prediction_suffixes_dawgs=prediction_suffixes_dawgs,
         Tag=Tag,
         paradigm_prefixes=paradigm_prefixes,
+        form_tables=form_tables,
     )
 
 
+def load_words(path):
+    """ Load words DAWG of a dictionary in ``path`` folder. """
+    return dawg.WordsDawg().load(os.path.join(path, 'words.dawg'))
+
+
+def load_prediction_suffixes_dawgs(path, paradigm_prefixes):
+    """
+    Load prediction DAWGs (one per paradigm prefix)
+    of a dictionary in ``path`` folder.
+    """
+    prediction_suffixes_dawgs = []
+    for prefix_id in range(len(paradigm_prefixes)):
+        fn = os.path.join(path, 'prediction-suffixes-%s.dawg' % prefix_id)
+        assert os.path.exists(fn)
+        prediction_suffixes_dawgs.append(dawg.PredictionSuffixesDAWG().load(fn))
+    return prediction_suffixes_dawgs
+
+
 def save_compiled_dict(compiled_dict, out_path, source_name, language_code):
     """
     Save a compiled_dict to ``out_path``
@@ -93,12 +173,14 @@ def save_compiled_dict(compiled_dict, out_path, source_name, language_code):
     json_write(_f('grammemes.json'), compiled_dict.parsed_dict.grammemes)
 
     gramtab_formats = {}
+    gramtabs = {}
     for format, Tag in tagset.registry.items():
         Tag._init_grammemes(compiled_dict.parsed_dict.grammemes)
         new_gramtab = [Tag._from_internal_tag(tag) for tag in compiled_dict.gramtab]
 
         gramtab_name = "gramtab-%s.json" % format
         gramtab_formats[format] = gramtab_name
+        gramtabs[format] = new_gramtab
 
         json_write(_f(gramtab_name), new_gramtab)
 
@@ -109,10 +191,14 @@ def save_compiled_dict(compiled_dict, out_path, source_name, language_code):
             para.tofile(f)
 
     json_write(_f('suffixes.json'), compiled_dict.suffixes)
+    _save_tables(_f(TABLES_FILENAME), compiled_dict.paradigms,
+                 compiled_dict.suffixes, gramtabs)
     compiled_dict.words_dawg.save(_f('words.dawg'))
 
     for prefix_id, prediction_suffixes_dawg in enumerate(compiled_dict.prediction_suffixes_dawgs):
         prediction_suffixes_dawg.save(_f('prediction-suffixes-%s.dawg' % prefix_id))
+    if compiled_dict.prediction_suffixes_index is not None:
+        compiled_dict.prediction_suffixes_index.save(_f(PREDICTION_INDEX_FILENAME))
 
     logger.debug("computing metadata..")
 
@@ -197,19 +283,305 @@ def _load_gramtab(meta, gramtab_format, path):
 
 
 def _load_paradigms(filename):
-    """ Load paradigms data """
-    paradigms = []
+    """
+    Load paradigms data. All paradigms are read into a single flat array;
+    per-paradigm length prefixes stay in this array between paradigms.
+    """
     with open(filename, 'rb') as f:
         paradigms_count = struct.unpack(str("<H"), f.read(2))[0]
+        data = array.array(str("H"))
+        data.fromfile(f, (os.path.getsize(filename) - 2) // data.itemsize)
+
+    if sys.byteorder != 'little':
+        data.byteswap()
+
+    starts = array.array(str("I"))
+    lengths = array.array(str("H"))
+    pos = 0
+    for x in range(paradigms_count):
+        paradigm_len = data[pos]
+        starts.append(pos + 1)
+        lengths.append(paradigm_len // 3)
+        pos += paradigm_len + 1
+
+    return FlatParadigms(data, starts, lengths)
+
+
+def build_tables(path):
+    """
+    Create ``tables.bin`` file for a dictionary in ``path`` folder
+    from its paradigms, suffixes and gramtab files. This is needed
+    to load dictionaries compiled without this file using mmap.
+    """
+    _f = lambda p: os.path.join(path, p)
+    meta = load_meta(_f('meta.json'))
+    _assert_format_is_compatible(meta, path)
+
+    gramtabs = dict(
+        (gramtab_format, _load_gramtab(meta, gramtab_format, path))
+        for gramtab_format in meta.get('gramtab_formats', {})
+    )
+    suffixes = json_read(_f('suffixes.json'))
+    paradigms = _load_paradigms(_f('paradigms.array'))
+    _save_tables(_f(TABLES_FILENAME), paradigms, suffixes, gramtabs)
+
+
+def build_prediction_index(path):
+    """
+    Create a merged prediction index file for a dictionary in ``path``
+    folder from its per-prefix prediction DAWGs. This is needed
+    for dictionaries compiled without this file.
+    """
+    from pymorphy2.opencorpora_dict.compile import _prediction_index_data
+    dawg.assert_can_create()
 
-        for x in range(paradigms_count):
-            paradigm_len = struct.unpack(str("<H"), f.read(2))[0]
+    _f = lambda p: os.path.join(path, p)
+    meta = load_meta(_f('meta.json'))
+    _assert_format_is_compatible(meta, path)
+
+    dawgs_data = []
+    for prefix_id in itertools.count():
+        fn = _f('prediction-suffixes-%s.dawg' % prefix_id)
+        if not os.path.exists(fn):
+            break
+        dawgs_data.append(dawg.PredictionSuffixesDAWG().load(fn).iteritems())
+
+    index = dawg.PredictionSuffixesIndexDAWG(_prediction_index_data(dawgs_data))
+    index.save(_f(PREDICTION_INDEX_FILENAME))
+
+
+def load_prediction_index(path):
+    """
+    Load a merged prediction index of a dictionary in ``path`` folder;
+    return None if the dictionary doesn't have it (dictionaries compiled
+    by older pymorphy2 versions don't have this file).
+    """
+    filename = os.path.join(path, PREDICTION_INDEX_FILENAME)
+    if not os.path.exists(filename):
+        return None
+    return dawg.PredictionSuffixesIndexDAWG().load(filename)
+
+
+class FlatParadigms(object):
+    """
+    A read-only sequence of paradigms stored in a single flat array.
+
+    Paradigm ``para_id`` has ``lengths[para_id]`` forms; it occupies
+    ``lengths[para_id]*3`` items of ``data`` starting from
+    ``starts[para_id]``: suffix ids, then tag ids, then prefix ids.
+    """
+    def __init__(self, data, starts, lengths):
+        self.data = data
+        self.starts = starts
+        self.lengths = lengths
+
+    @classmethod
+    def from_offsets(cls, offsets, data):
+        """
+        Create FlatParadigms from ``offsets`` array where
+        ``data[offsets[para_id]:offsets[para_id+1]]`` is
+        paradigm ``para_id``.
+        """
+        lengths = array.array(str("H"), [
+            (offsets[para_id+1] - offsets[para_id]) // 3
+            for para_id in range(len(offsets) - 1)
+        ])
+        return cls(data, offsets, lengths)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, para_id):
+        start = self.starts[para_id]
+        return self.data[start:start + self.lengths[para_id]*3]
+
+    def __iter__(self):
+        for para_id in range(len(self)):
+            yield self[para_id]
+
+
+def build_form_tables(paradigms):
+    """
+    Return ``(form_offsets, suffix_ids, tag_ids, prefix_ids)`` arrays
+    for :class:`FlatParadigms`. Form ``idx`` of paradigm ``para_id``
+    has id ``form_offsets[para_id] + idx``; other arrays are indexed
+    by this id.
+    """
+    data = paradigms.data
+    form_offsets = array.array(str("I"))
+    suffix_ids = array.array(str("H"))
+    tag_ids = array.array(str("H"))
+    prefix_ids = array.array(str("H"))
+
+    for para_id, start in enumerate(paradigms.starts[:len(paradigms)]):
+        paradigm_len = paradigms.lengths[para_id]
+        form_offsets.append(len(suffix_ids))
+        suffix_ids.extend(data[start:start + paradigm_len])
+        tag_ids.extend(data[start + paradigm_len:start + paradigm_len*2])
+        prefix_ids.extend(data[start + paradigm_len*2:start + paradigm_len*3])
+
+    return form_offsets, suffix_ids, tag_ids, prefix_ids
+
+
+class IdTable(object):
+    """
+    A read-only sequence of ``values[ids[index]]`` items;
+    values are looked up on access.
+    """
+    def __init__(self, ids, values):
+        self._ids = ids
+        self._values = values
 
-            para = array.array(str("H"))
-            para.fromfile(f, paradigm_len)
+    def __len__(self):
+        return len(self._ids)
 
-            paradigms.append(para)
-    return paradigms
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            values = self._values
+            return [values[value_id] for value_id in self._ids[index]]
+        return self._values[self._ids[index]]
+
+    def __iter__(self):
+        values = self._values
+        for value_id in self._ids:
+            yield values[value_id]
+
+
+class StringTable(object):
+    """
+    A read-only sequence of unicode strings stored in a flat
+    utf8-encoded buffer; strings are decoded on access.
+    """
+    def __init__(self, offsets, data):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = self._offsets[index], self._offsets[index+1]
+        return _utf_8_decode(self._data[start:end])[0]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def _flat_string_table(strings):
+    """ Return (offsets, data) arrays for a list of strings """
+    offsets = array.array(str("I"), [0])
+    data = array.array(str("B"))
+    for s in strings:
+        data.extend(bytearray(s.encode('utf8')))
+        offsets.append(len(data))
+    return offsets, data
+
+
+def _flat_paradigms(paradigms):
+    """ Return (offsets, data) arrays for a list of paradigms """
+    offsets = array.array(str("I"), [0])
+    data = array.array(str("H"))
+    for para in paradigms:
+        data.extend(para)
+        offsets.append(len(data))
+    return offsets, data
+
+
+def _save_tables(filename, paradigms, suffixes, gramtabs):
+    """
+    Save paradigms, suffixes and gramtabs (a dict
+    ``{gramtab_format: list of tag strings}``) to ``filename``.
+    """
+    sections = []
+    paradigms_offsets, paradigms_data = _flat_paradigms(paradigms)
+    sections.extend(zip(['paradigms-offsets', 'paradigms-data'],
+                        [paradigms_offsets, paradigms_data]))
+    form_tables = build_form_tables(
+        FlatParadigms.from_offsets(paradigms_offsets, paradigms_data))
+    sections.extend(zip(_FORM_TABLES_SECTIONS, form_tables))
+    sections.extend(zip(['suffixes-offsets', 'suffixes-data'],
+                        _flat_string_table(suffixes)))
+    for gramtab_format, gramtab in sorted(gramtabs.items()):
+        names = ['gramtab-%s-offsets' % gramtab_format,
+                 'gramtab-%s-data' % gramtab_format]
+        sections.extend(zip(names, _flat_string_table(gramtab)))
+    _write_sections(filename, sections)
+
+
+def _align(pos, alignment=8):
+    return (pos + alignment - 1) // alignment * alignment
+
+
+def _write_sections(filename, sections):
+    """
+    Write ``sections`` (a list of ``(name, array.array)`` tuples) to a file.
+
+    File layout: magic bytes, header length (4 bytes),
+    a JSON header with section offsets, then arrays data; each array
+    starts at 8-byte aligned position and uses native byte order.
+    """
+    header_sections = {}
+    offset = 0
+    for name, arr in sections:
+        header_sections[name] = [offset, arr.typecode, len(arr)]
+        offset = _align(offset + len(arr) * arr.itemsize)
+
+    header = json.dumps({
+        'version': TABLES_FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'sections': header_sections,
+    }, sort_keys=True).encode('utf8')
+
+    with open(filename, 'wb') as f:
+        f.write(_TABLES_MAGIC)
+        f.write(struct.pack(str("<I"), len(header)))
+        f.write(header)
+        data_start = _align(f.tell())
+        for name, arr in sections:
+            f.write(b'\0' * (data_start + header_sections[name][0] - f.tell()))
+            arr.tofile(f)
+
+
+def _load_tables(filename, use_mmap=False):
+    """
+    Load a file created by :func:`_write_sections`; return a dict
+    ``{section_name: array}``. When ``use_mmap`` is True (and it is
+    possible) arrays are memoryviews of a read-only mmap.
+    """
+    with open(filename, 'rb') as f:
+        if f.read(len(_TABLES_MAGIC)) != _TABLES_MAGIC:
+            raise ValueError("%s is not a pymorphy2 tables file" % filename)
+        header_length = struct.unpack(str("<I"), f.read(4))[0]
+        header = json.loads(f.read(header_length).decode('utf8'))
+        data_start = _align(f.tell())
+
+        if header['version'] != TABLES_FORMAT_VERSION:
+            raise ValueError("Unsupported %s format version: %s" % (
+                filename, header['version']))
+
+        native = header['byteorder'] == sys.byteorder
+        if use_mmap and native and hasattr(memoryview, 'cast'):
+            buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            return dict(
+                (name, _mmap_section(buf, data_start + offset, typecode, length))
+                for name, (offset, typecode, length) in header['sections'].items()
+            )
+
+        result = {}
+        for name, (offset, typecode, length) in header['sections'].items():
+            f.seek(data_start + offset)
+            arr = array.array(str(typecode))
+            arr.fromfile(f, length)
+            if not native:
+                arr.byteswap()
+            result[name] = arr
+        return result
+
+
+def _mmap_section(buf, start, typecode, length):
+    itemsize = array.array(str(typecode)).itemsize
+    return buf[start:start + length*itemsize].cast(str(typecode))
 
 
 def _assert_format_is_compatible(meta, path):
@@ -1,7 +1,17 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals, division
+import os
 import logging
-from .storage import load_dict
+import threading
+import weakref
+from .storage import (
+    build_form_tables,
+    IdTable,
+    load_dict,
+    load_prediction_index,
+    load_words,
+    load_prediction_suffixes_dawgs,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -11,36 +21,153 @@ class Dictionary(object):
     OpenCorpora dictionary wrapper class.
     """
 
-    def __init__(self, path):
+    # Max number of paradigms cached by get_paradigm_info
+    paradigm_info_cache_size = 1000
+
+    # Components which are loaded on first access (or by load_components)
+    LAZY_COMPONENTS = ('words', 'prediction_suffixes_dawgs', 'prediction_suffixes_index')
+
+    def __init__(self, path, use_mmap=False):
 
         logger.info("Loading dictionaries from %s", path)
 
-        self._data = load_dict(path)
+        self._data = load_dict(path, use_mmap=use_mmap, lazy=True)
+        self._components_lock = threading.Lock()
+        self._shared = {}
+        self._shared_lock = threading.Lock()
 
         logger.info("format: %(format_version)s, revision: %(source_revision)s, updated: %(compiled_at)s", self._data.meta)
 
         # attributes from opencorpora_dict.storage.LoadedDictionary
-        self.paradigms = self._data.paradigms
+        self.paradigms = self._data.paradigms  # storage.FlatParadigms
         self.gramtab = self._data.gramtab
         self.paradigm_prefixes = self._data.paradigm_prefixes
         self.suffixes = self._data.suffixes
-        self.words = self._data.words
-        self.prediction_suffixes_dawgs = self._data.prediction_suffixes_dawgs
         self.meta = self._data.meta
         self.Tag = self._data.Tag
         self.lang = self.meta.get('language_code')
+        # words, prediction_suffixes_dawgs and prediction_suffixes_index
+        # are loaded lazily, see __getattr__
 
         # extra attributes
         self.path = path
 
+        logger.debug("Building form tables...")
+        self._build_form_tables(use_mmap)
+        self._paradigm_info_cache = {}
+
+        # Tags are interned (and kept alive by the gramtab),
+        # so they are looked up by identity.
+        self._tag_ids = {}
+        for tag_id, tag in enumerate(self.gramtab):
+            self._tag_ids.setdefault(id(tag), tag_id)
+
+    def __getattr__(self, name):
+        # Lazy components are loaded on first access;
+        # after that they are regular instance attributes.
+        if name not in self.LAZY_COMPONENTS:
+            raise AttributeError(name)
+
+        with self._components_lock:
+            if name not in self.__dict__:
+                logger.debug("Loading %s...", name)
+                if name == 'words':
+                    value = load_words(self.path)
+                elif name == 'prediction_suffixes_dawgs':
+                    value = load_prediction_suffixes_dawgs(self.path, self.paradigm_prefixes)
+                else:
+                    # None if the dictionary doesn't have the index
+                    value = load_prediction_index(self.path)
+                setattr(self, name, value)
+        return self.__dict__[name]
+
+    def load_components(self, names=None):
+        """
+        Load lazy dictionary components with given ``names``
+        (all components by default) if they are not loaded yet.
+        """
+        for name in (self.LAZY_COMPONENTS if names is None else names):
+            getattr(self, name)
+
+    def loaded_components(self):
+        """ Return a list of lazy components which are loaded. """
+        return [name for name in self.LAZY_COMPONENTS if name in self.__dict__]
+
+    def get_shared(self, key, create):
+        """
+        Return an object stored under ``key``; if there is no such object,
+        create it by calling ``create()``. Use it for immutable
+        state (e.g. of analyzer units) which can be shared by all
+        analyzers using this dictionary.
+        """
+        with self._shared_lock:
+            try:
+                return self._shared[key]
+            except KeyError:
+                value = self._shared[key] = create()
+                return value
+
+    def _build_form_tables(self, use_mmap):
+        """
+        Precompute per-form lookup tables. Form ``idx`` of paradigm
+        ``para_id`` has id ``form_offsets[para_id] + idx``;
+        ``form_tags``, ``form_prefixes`` and ``form_suffixes`` are
+        indexed by this id. ``normal_affixes[para_id]`` is a
+        ``(prefix, suffix)`` tuple of the paradigm normal form.
+
+        When the dictionary is loaded using mmap, ``form_tags``,
+        ``form_prefixes`` and ``form_suffixes`` are :class:`IdTable`
+        objects: they store only id arrays (memory-mapped from
+        ``tables.bin`` if the file has them) and look up tags and
+        affixes on access. Otherwise they are lists, which are faster,
+        but are private to each process.
+        """
+        form_tables = self._data.form_tables
+        if form_tables is None:
+            form_tables = build_form_tables(self.paradigms)
+        form_offsets, suffix_ids, tag_ids, prefix_ids = form_tables
+
+        gramtab = self.gramtab
+        prefixes = self.paradigm_prefixes
+        suffixes = self.suffixes
+        if use_mmap:
+            form_tags = IdTable(tag_ids, gramtab)
+            form_prefixes = IdTable(prefix_ids, prefixes)
+            form_suffixes = IdTable(suffix_ids, suffixes)
+        else:
+            form_tags = [gramtab[tag_id] for tag_id in tag_ids]
+            form_prefixes = [prefixes[prefix_id] for prefix_id in prefix_ids]
+            form_suffixes = [suffixes[suffix_id] for suffix_id in suffix_ids]
+
+        self.form_offsets = form_offsets
+        self.form_tags = form_tags
+        self.form_prefixes = form_prefixes
+        self.form_suffixes = form_suffixes
+        self.normal_affixes = [
+            (form_prefixes[form_id], form_suffixes[form_id])
+            for form_id in form_offsets
+        ]
+
+    def get_prediction_suffixes_index(self):
+        """
+        Return a merged prediction index (a DAWG keyed by reversed word
+        endings) or None if the dictionary doesn't have it.
+        The index is loaded on first access.
+        """
+        return self.prediction_suffixes_index
+
+    def tag_id(self, tag):
+        """
+        Return an id of ``tag`` (an index in the gramtab)
+        or None if the tag is not in this dictionary.
+        """
+        return self._tag_ids.get(id(tag))
+
     def build_tag_info(self, para_id, idx):
         """
         Return tag as a string.
         """
-        paradigm = self.paradigms[para_id]
-        tag_info_offset = len(paradigm) // 3
-        tag_id = paradigm[tag_info_offset + idx]
-        return self.gramtab[tag_id]
+        return self.form_tags[self.form_offsets[para_id] + idx]
 
     def build_paradigm_info(self, para_id):
         """
@@ -50,19 +177,29 @@ class Dictionary(object):
 
         tuples representing the paradigm.
         """
-        paradigm = self.paradigms[para_id]
-        paradigm_len = len(paradigm) // 3
-        res = []
-        for idx in range(paradigm_len):
-            prefix_id = paradigm[paradigm_len*2 + idx]
-            prefix = self.paradigm_prefixes[prefix_id]
+        return list(self.get_paradigm_info(para_id))
 
-            suffix_id = paradigm[idx]
-            suffix = self.suffixes[suffix_id]
-
-            res.append(
-                (prefix, self.build_tag_info(para_id, idx), suffix)
-            )
+    def get_paradigm_info(self, para_id):
+        """
+        Return a tuple of ``(prefix, tag, suffix)`` tuples representing
+        the paradigm. Results are cached (paradigms are immutable),
+        so this is faster than :meth:`build_paradigm_info`.
+        """
+        cache = self._paradigm_info_cache
+        res = cache.get(para_id)
+        if res is None:
+            start = self.form_offsets[para_id]
+            end = start + self.paradigms.lengths[para_id]
+            res = tuple(zip(
+                self.form_prefixes[start:end],
+                self.form_tags[start:end],
+                self.form_suffixes[start:end],
+            ))
+            # A plain dict is used: its operations are atomic, so no lock
+            # is needed. The cache is emptied when it is full.
+            if len(cache) >= self.paradigm_info_cache_size:
+                cache.clear()
+            cache[para_id] = res
         return res
 
     def build_normal_form(self, para_id, idx, fixed_word):
@@ -73,18 +210,8 @@ class Dictionary(object):
         if idx == 0:  # a shortcut: normal form is a word itself
             return fixed_word
 
-        paradigm = self.paradigms[para_id]
-        paradigm_len = len(paradigm) // 3
-
-        stem = self.build_stem(paradigm, idx, fixed_word)
-
-        normal_prefix_id = paradigm[paradigm_len*2 + 0]
-        normal_suffix_id = paradigm[0]
-
-        normal_prefix = self.paradigm_prefixes[normal_prefix_id]
-        normal_suffix = self.suffixes[normal_suffix_id]
-
-        return normal_prefix + stem + normal_suffix
+        normal_prefix, normal_suffix = self.normal_affixes[para_id]
+        return normal_prefix + self.build_stem_by_id(para_id, idx, fixed_word) + normal_suffix
 
     def build_stem(self, paradigm, idx, fixed_word):
         """
@@ -103,6 +230,16 @@ class Dictionary(object):
         else:
             return fixed_word[len(prefix):]
 
+    def build_stem_by_id(self, para_id, idx, fixed_word):
+        """
+        Return word stem (given a word, paradigm id and the word index).
+        This is faster than :meth:`build_stem`.
+        """
+        form_id = self.form_offsets[para_id] + idx
+        prefix_len = len(self.form_prefixes[form_id])
+        suffix_len = len(self.form_suffixes[form_id])
+        return fixed_word[prefix_len:len(fixed_word)-suffix_len]
+
     def word_is_known(self, word, substitutes_compiled=None):
         """
         Check if a ``word`` is in the dictionary.
@@ -141,3 +278,34 @@ class Dictionary(object):
         return str("<%s>") % self.__class__.__name__
 
 
+
+
+# Dictionaries shared by MorphAnalyzer instances, see get_dictionary.
+_dictionaries = weakref.WeakValueDictionary()
+_dictionaries_lock = threading.Lock()
+
+
+def get_dictionary(path, use_mmap=False):
+    """
+    Return a :class:`Dictionary` for ``path``. The dictionary is loaded
+    once per process: while it is in use (there are references to it),
+    the same object is returned for the same ``path`` and ``use_mmap``.
+    """
+    key = (os.path.abspath(path), use_mmap)
+    with _dictionaries_lock:
+        dictionary = _dictionaries.get(key)
+        if dictionary is None:
+            dictionary = Dictionary(path, use_mmap=use_mmap)
+            _dictionaries[key] = dictionary
+        return dictionary
+
+
+def release_dictionary(path, use_mmap=False):
+    """
+    Stop sharing a dictionary for ``path``: :func:`get_dictionary`
+    will load it again. Existing users of the dictionary keep it;
+    it is freed when it is no longer used.
+    """
+    key = (os.path.abspath(path), use_mmap)
+    with _dictionaries_lock:
+        _dictionaries.pop(key, None)
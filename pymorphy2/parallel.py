@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`pymorphy2.parallel` is a module for processing large corpora
+using several worker processes.
+
+Worker processes are forked after the dictionary is loaded, so they share
+dictionary memory with the parent process (copy-on-write) and don't have
+to load it again. When ``fork`` is unavailable (or when another
+``start_method`` is requested) MorphAnalyzer is pickled and each worker
+loads its own copy of the dictionary.
+
+Results are returned in the same order as input tokens.
+"""
+from __future__ import absolute_import, unicode_literals, division
+import sys
+import collections
+import itertools
+import multiprocessing
+
+from pymorphy2.analyzer import MorphAnalyzer
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# MorphAnalyzer instance used by worker processes
+_morph = None
+
+
+def parse_corpus(tokens, morph=None, jobs=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 start_method=None):
+    """
+    Parse ``tokens`` using ``jobs`` worker processes (default is the number
+    of CPUs). Return an iterator over lists of parses, one list per token.
+    Each parse is a ``(word, tag, normal_form, score)`` tuple; ``tag`` is
+    a string (use ``morph.TagClass(tag)`` to get a tag object).
+
+    ``tokens`` are sent to workers in chunks of ``chunk_size`` tokens.
+    """
+    return _process_corpus(_parse_chunk, tokens, morph, jobs, chunk_size,
+                           start_method)
+
+
+def lemmatize_corpus(tokens, morph=None, jobs=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                     start_method=None):
+    """
+    Return an iterator over the most probable normal forms of ``tokens``.
+    Tokens are processed by ``jobs`` worker processes
+    (default is the number of CPUs) in chunks of ``chunk_size`` tokens.
+    """
+    return _process_corpus(_lemmatize_chunk, tokens, morph, jobs, chunk_size,
+                           start_method)
+
+
+def map_chunks(func, chunks, morph=None, jobs=None, start_method=None):
+    """
+    Return an iterator over ``func(morph, chunk)`` results for each chunk
+    in ``chunks``, computed by ``jobs`` worker processes (default is
+    the number of CPUs); results are in the same order as chunks.
+
+    ``func`` is called in worker processes, so it must be picklable
+    (e.g. a module-level function or a ``functools.partial`` of it).
+    """
+    if morph is None:
+        morph = MorphAnalyzer()
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+
+    if jobs == 1:
+        return (func(morph, chunk) for chunk in chunks)
+    return _map_chunks_in_pool(func, chunks, morph, jobs, start_method)
+
+
+def _parse_chunk(morph, tokens):
+    return [
+        [(p[0], str(p[1]), p[2], p[3]) for p in parses]
+        for parses in morph.parse_many(tokens)
+    ]
+
+
+def _lemmatize_chunk(morph, tokens):
+    return [normal_forms[0] for normal_forms in morph.normal_forms_many(tokens)]
+
+
+def _process_corpus(func, tokens, morph, jobs, chunk_size, start_method):
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    chunks = _iter_chunks(tokens, chunk_size)
+    results = map_chunks(func, chunks, morph, jobs, start_method)
+    return itertools.chain.from_iterable(results)
+
+
+def _map_chunks_in_pool(func, chunks, morph, jobs, start_method):
+    pool = _create_pool(morph, jobs, start_method)
+    try:
+        # Don't send all chunks at once: only keep a few chunks per worker
+        # in flight to make memory usage independent of corpus size.
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_call_in_worker, (func, chunk)))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+def _call_in_worker(func, chunk):
+    return func(_morph, chunk)
+
+
+def _create_pool(morph, jobs, start_method=None):
+    """
+    Create a multiprocessing Pool with ``jobs`` workers which use ``morph``.
+    """
+    if start_method is None and 'fork' in _get_all_start_methods():
+        start_method = 'fork'
+
+    # With 'fork' workers inherit initializer arguments (and so
+    # MorphAnalyzer) from this process, including workers which are
+    # started again by the pool. Otherwise workers get a pickled
+    # MorphAnalyzer (see MorphAnalyzer.__reduce__) and load
+    # the dictionary themselves.
+    return _get_context(start_method).Pool(jobs, _init_worker, (morph,))
+
+
+def _init_worker(morph):
+    global _morph
+    _morph = morph
+
+
+def _get_all_start_methods():
+    if hasattr(multiprocessing, 'get_all_start_methods'):
+        return multiprocessing.get_all_start_methods()
+    # Python 2.x always forks on Unix
+    return ['spawn'] if sys.platform == 'win32' else ['fork']
+
+
+def _get_context(start_method):
+    if hasattr(multiprocessing, 'get_context'):
+        return multiprocessing.get_context(start_method)
+    return multiprocessing
+
+
+def _iter_chunks(iterable, size):
+    """
+    Split ``iterable`` into lists of ``size`` elements
+    (the last list can be shorter).
+
+    >>> list(_iter_chunks(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -4,6 +4,10 @@ Utils for working with grammatical tags.
 """
 from __future__ import absolute_import, unicode_literals
 import collections
+import operator
+import threading
+import weakref
+from functools import reduce
 
 try:
     from sys import intern
@@ -16,9 +20,14 @@ class _select_grammeme_from(object):
     """
     Descriptor object for accessing grammemes of certain classes
     (e.g. number or voice).
+
+    Values are precomputed for each tag (see ``OpencorporaTag._categories``);
+    ``index`` is a position of the grammeme class
+    in ``OpencorporaTag._CATEGORIES``.
     """
-    def __init__(self, grammeme_set):
+    def __init__(self, grammeme_set, index):
         self.grammeme_set = grammeme_set
+        self.index = index
         # ... are descriptors not magical enough?
 
         # In order to fight typos, raise an exception
@@ -43,15 +52,18 @@ class _select_grammeme_from(object):
 
         self.TypedGrammeme = TypedGrammeme
 
-    def __get__(self, instance, owner):
-        grammemes = self.grammeme_set & instance.grammemes
+        # TypedGrammeme objects are immutable, so they are shared by all tags
+        self._typed = dict((gr, TypedGrammeme(gr)) for gr in grammeme_set)
 
-        if not grammemes:
-            # XXX: type checks are not enforced in this case
-            return None
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
 
-        res = next(iter(grammemes))
-        return self.TypedGrammeme(res) if owner.typed_grammemes else res
+        res = instance._categories[self.index]
+        if res is None or not owner.typed_grammemes:
+            # XXX: type checks are not enforced for None
+            return res
+        return self._typed[res]
 
 
 # Design notes: Tag objects are immutable, but the tag class is mutable.
@@ -215,6 +227,12 @@ class OpencorporaTag(object):
         'excl',  # говорящий не включён в действие
     ])
 
+    # Grammeme classes available as tag attributes
+    # (tag.POS, tag.animacy, etc.; see attribute definitions below)
+    _CATEGORIES = (PARTS_OF_SPEECH, ANIMACY, ASPECTS, CASES, GENDERS,
+                   INVOLVEMENT, MOODS, NUMBERS, PERSONS, TENSES,
+                   TRANSITIVITY, VOICES)
+
     # Set this to False (as a class attribute) to disable strict
     # grammeme type checking for tag.POS, tag.voice, etc. attributes.
     # Without type checks comparisons are about 2x faster.
@@ -237,6 +255,15 @@ class OpencorporaTag(object):
     }
     _GRAMMEME_INDICES = collections.defaultdict(int)
     _GRAMMEME_INCOMPATIBLE = collections.defaultdict(set)
+
+    # Each grammeme gets a bit; tags store a bitmask of their grammemes.
+    # Bits are never reassigned, so masks of existing tags stay valid
+    # when grammemes are initialized again.
+    _GRAMMEME_BITS = {}
+    _BIT_GRAMMEMES = {}
+    _CATEGORY_MASKS = ()
+    _INCOMPATIBLE_MASKS = {}
+    _NON_PRODUCTIVE_MASK = 0
     _LAT2CYR = None
     _CYR2LAT = None
     KNOWN_GRAMMEMES = set()
@@ -260,9 +287,28 @@ class OpencorporaTag(object):
     }
 
     __slots__ = ['_grammemes_tuple', '_grammemes_cache', '_str', '_POS',
-                 '_cyr', '_cyr_grammemes_cache']
-
-    def __init__(self, tag):
+                 '_cyr', '_cyr_grammemes_cache', '_mask', '_categories',
+                 '__weakref__']
+
+    # Tag objects are interned: Tag(tag_str) returns the same object
+    # for the same tag_str while it is alive, so tags of all analyzers
+    # are shared and can be compared by identity. Tags which are not
+    # used anymore (e.g. tags made for unknown words) are dropped;
+    # gramtab tags are kept alive by dictionaries.
+    _instances = weakref.WeakValueDictionary()
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, tag):
+        try:
+            return cls._instances[tag]
+        except KeyError:
+            pass
+        self = super(OpencorporaTag, cls).__new__(cls)
+        self._init_tag(tag)
+        with cls._instances_lock:
+            return cls._instances.setdefault(tag, self)
+
+    def _init_tag(self, tag):
         self._str = tag
         # XXX: we loose information about which grammemes
         # belongs to lexeme and which belongs to form
@@ -279,23 +325,35 @@ class OpencorporaTag(object):
 
         self._grammemes_tuple = grammemes_tuple
         self._POS = self._grammemes_tuple[0]
+        try:
+            self._mask = reduce(operator.or_, map(self._GRAMMEME_BITS.__getitem__, grammemes_tuple))
+        except KeyError:
+            self._mask = self._grammemes_mask(grammemes_tuple)
+
+        # a grammeme (or None) for each grammeme class
+        bit_grammemes = self._BIT_GRAMMEMES
+        self._categories = tuple([
+            bit_grammemes.get(mask & -mask)
+            for mask in [self._mask & category_mask
+                         for category_mask in self._CATEGORY_MASKS]
+        ])
         self._grammemes_cache = None
         self._cyr_grammemes_cache = None
         self._cyr = None
 
     # attributes for grammeme categories
-    POS = _select_grammeme_from(PARTS_OF_SPEECH)
-    animacy = _select_grammeme_from(ANIMACY)
-    aspect = _select_grammeme_from(ASPECTS)
-    case = _select_grammeme_from(CASES)
-    gender = _select_grammeme_from(GENDERS)
-    involvement = _select_grammeme_from(INVOLVEMENT)
-    mood = _select_grammeme_from(MOODS)
-    number = _select_grammeme_from(NUMBERS)
-    person = _select_grammeme_from(PERSONS)
-    tense = _select_grammeme_from(TENSES)
-    transitivity = _select_grammeme_from(TRANSITIVITY)
-    voice = _select_grammeme_from(VOICES)
+    POS = _select_grammeme_from(PARTS_OF_SPEECH, 0)
+    animacy = _select_grammeme_from(ANIMACY, 1)
+    aspect = _select_grammeme_from(ASPECTS, 2)
+    case = _select_grammeme_from(CASES, 3)
+    gender = _select_grammeme_from(GENDERS, 4)
+    involvement = _select_grammeme_from(INVOLVEMENT, 5)
+    mood = _select_grammeme_from(MOODS, 6)
+    number = _select_grammeme_from(NUMBERS, 7)
+    person = _select_grammeme_from(PERSONS, 8)
+    tense = _select_grammeme_from(TENSES, 9)
+    transitivity = _select_grammeme_from(TRANSITIVITY, 10)
+    voice = _select_grammeme_from(VOICES, 11)
 
     @property
     def grammemes(self):
@@ -332,6 +390,8 @@ class OpencorporaTag(object):
     def __contains__(self, grammeme):
 
         # {'NOUN', 'sing'} in tag
+        # (frozenset comparison is faster than building a bitmask
+        # for the argument)
         if isinstance(grammeme, (set, frozenset)):
             if grammeme <= self.grammemes:
                 return True
@@ -339,7 +399,8 @@ class OpencorporaTag(object):
             return False
 
         # 'NOUN' in tag
-        if grammeme in self.grammemes:
+        bit = self._GRAMMEME_BITS.get(grammeme)
+        if bit is not None and self._mask & bit:
             return True
         else:
             if not self.grammeme_is_known(grammeme):
@@ -378,11 +439,41 @@ class OpencorporaTag(object):
 
 
     def is_productive(self):
-        return not self.grammemes & self._NON_PRODUCTIVE_GRAMMEMES
+        return not self._mask & self._NON_PRODUCTIVE_MASK
 
     def _is_unknown(self):
         return self._POS not in self.PARTS_OF_SPEECH
 
+    @classmethod
+    def _grammemes_mask(cls, grammemes):
+        """ Return a bitmask for ``grammemes``; new grammemes get new bits. """
+        bits = cls._GRAMMEME_BITS
+        mask = 0
+        for grammeme in grammemes:
+            bit = bits.get(grammeme)
+            if bit is None:
+                bit = 1 << len(bits)
+                bits[grammeme] = bit
+                cls._BIT_GRAMMEMES[bit] = grammeme
+            mask |= bit
+        return mask
+
+    @classmethod
+    def _init_masks(cls, grammemes=()):
+        if '_GRAMMEME_BITS' not in cls.__dict__:
+            # subclasses don't share bits and tags with the parent class
+            cls._GRAMMEME_BITS = {}
+            cls._BIT_GRAMMEMES = {}
+            cls._instances = weakref.WeakValueDictionary()
+
+        cls._grammemes_mask(grammemes)
+        cls._CATEGORY_MASKS = tuple([
+            cls._grammemes_mask(grammeme_set) for grammeme_set in cls._CATEGORIES
+        ])
+        cls._NON_PRODUCTIVE_MASK = cls._grammemes_mask(cls._NON_PRODUCTIVE_GRAMMEMES)
+        # incompatible grammemes may change, so masks are computed again
+        cls._INCOMPATIBLE_MASKS = {}
+
     @classmethod
     def grammeme_is_known(cls, grammeme):
         cls._assert_grammemes_initialized()
@@ -407,12 +498,41 @@ class OpencorporaTag(object):
         Return a new set of grammemes with ``required`` grammemes added
         and incompatible grammemes removed.
         """
-        new_grammemes = self.grammemes | required
+        return self._mask_grammemes(self._updated_grammemes_mask(required))
+
+    def _updated_grammemes_mask(self, required):
+        """
+        The same as :meth:`updated_grammemes`, but return
+        a bitmask of the grammemes.
+        """
+        mask = self._mask
         for grammeme in required:
             if not self.grammeme_is_known(grammeme):
                 raise ValueError("Unknown grammeme: %s" % grammeme)
-            new_grammemes -= self._GRAMMEME_INCOMPATIBLE[grammeme]
-        return new_grammemes
+            mask |= self._grammemes_mask((grammeme,))
+        for grammeme in required:
+            mask &= ~self._incompatible_mask(grammeme)
+        return mask
+
+    @classmethod
+    def _incompatible_mask(cls, grammeme):
+        """ Return a bitmask of grammemes incompatible with ``grammeme`` """
+        mask = cls._INCOMPATIBLE_MASKS.get(grammeme)
+        if mask is None:
+            mask = cls._grammemes_mask(cls._GRAMMEME_INCOMPATIBLE[grammeme])
+            cls._INCOMPATIBLE_MASKS[grammeme] = mask
+        return mask
+
+    @classmethod
+    def _mask_grammemes(cls, mask):
+        """ Return a frozenset of grammemes from a bitmask """
+        bit_grammemes = cls._BIT_GRAMMEMES
+        grammemes = []
+        while mask:
+            bit = mask & -mask
+            grammemes.append(bit_grammemes[bit])
+            mask ^= bit
+        return frozenset(grammemes)
 
     @classmethod
     def fix_rare_cases(cls, grammemes):
@@ -472,6 +592,8 @@ class OpencorporaTag(object):
 
             cls._GRAMMEME_INCOMPATIBLE[name] = frozenset(incompatible)
 
+        cls._init_masks([name for (name, parent, alias, description) in dict_grammemes])
+
     # XXX: do we still need these methods?
     @classmethod
     def _from_internal_tag(cls, tag):
@@ -482,14 +604,27 @@ class OpencorporaTag(object):
     def _from_internal_grammeme(cls, grammeme):
         return grammeme
 
-    def numeral_agreement_grammemes(self, num):
+    @staticmethod
+    def numeral_agreement_class(num):
+        """
+        Return 0 for numbers like 1 and 21, 1 for numbers
+        like 2 and 24 and 2 for other numbers (e.g. 5, 11 or 12).
+        Words which agree with numbers of the same class
+        have the same form.
+        """
         if (num % 10 == 1) and (num % 100 != 11):
-            index = 0
+            return 0
         elif (num % 10 >= 2) and (num % 10 <= 4) and (num % 100 < 10 or num % 100 >= 20):
-            index = 1
+            return 1
         else:
-            index = 2
+            return 2
+
+    def numeral_agreement_grammemes(self, num):
+        return self._numeral_agreement_class_grammemes(
+            self.numeral_agreement_class(num)
+        )
 
+    def _numeral_agreement_class_grammemes(self, index):
         if self.POS not in ('NOUN', 'ADJF', 'PRTF'):
             return set([])
 
@@ -570,6 +705,7 @@ class CyrillicOpencorporaTag(OpencorporaTag):
         cls._NON_PRODUCTIVE_GRAMMEMES = set([
             cls._from_internal_grammeme(gr) for gr in cls._NON_PRODUCTIVE_GRAMMEMES
         ])
+        cls._init_masks()
 
     @classmethod
     def _init_alias_map(cls, dict_grammemes):
@@ -2,6 +2,7 @@
 from __future__ import absolute_import, unicode_literals, division
 import inspect
 
+from pymorphy2.cache import LRUCache, cached_list
 from pymorphy2.utils import kwargs_repr
 from pymorphy2.units.utils import (
     without_last_method,
@@ -22,14 +23,63 @@ class BaseAnalyzerUnit(object):
 
     In __init__ method all parameters must be saved as instance variables
     for analyzer unit to work.
+
+    Dictionary components are loaded lazily; components a unit
+    always needs should be listed in `dictionary_components`, so that
+    MorphAnalyzer loads them in advance (see
+    `pymorphy2.opencorpora_dict.Dictionary.LAZY_COMPONENTS`).
+
+    Units which analyze parts of the word (e.g. a word without a prefix)
+    should use `parse_subword` and `tag_subword` methods: their results
+    are memoized, at most ``subword_cache_size`` parts (an argument of
+    MorphAnalyzer) are cached for each method.
     """
     morph = None
     dict = None
     _repr_skip_value_params = None
+    # {param: default} - params are not shown in repr if they have these values
+    _repr_default_params = None
+    dictionary_components = ()
 
     def init(self, morph):
         self.morph = morph
         self.dict = morph.dictionary
+        self._init_subword_cache(morph._subword_cache_size)
+
+    def _init_subword_cache(self, cache_size):
+        self._subword_caches = {}
+        if not cache_size:
+            return
+
+        for name in ['parse_subword', 'tag_subword']:
+            self._subword_caches[name] = LRUCache(cache_size)
+
+    def parse_subword(self, word):
+        """ Parse a part of the word using the whole analyzer. """
+        cache = self._subword_caches.get('parse_subword')
+        if cache is not None:
+            return cached_list(cache, self.morph.parse, word)
+        return self.morph.parse(word)
+
+    def tag_subword(self, word):
+        """ Return possible tags for a part of the word. """
+        cache = self._subword_caches.get('tag_subword')
+        if cache is not None:
+            return cached_list(cache, self.morph.tag, word)
+        return self.morph.tag(word)
+
+    def subword_cache_info(self):
+        """
+        Return a dict with cache statistics for `parse_subword`
+        and `tag_subword` methods.
+        """
+        return dict(
+            (name, cache.info()) for name, cache in self._subword_caches.items()
+        )
+
+    def subword_cache_clear(self):
+        for cache in self._subword_caches.values():
+            cache.clear()
 
     def clone(self):
         return self.__class__(**self._get_params())
@@ -52,10 +102,25 @@ class BaseAnalyzerUnit(object):
     def get_lexeme(self, form):
         raise NotImplementedError()
 
+    def inflect(self, form, required_grammemes):
+        """
+        Return a list with the form of ``form`` lexeme which has
+        ``required_grammemes`` and is the most similar to ``form``
+        (or an empty list if there is no such form).
+
+        Units may implement it to inflect words without building
+        a lexeme; None means the unit can't do it and
+        MorphAnalyzer should use the lexeme instead.
+        """
+        return None
+
     def __repr__(self):
         cls_text = self.__class__.__name__
-        kwargs_text = kwargs_repr(self._get_params(),
-                                  self._repr_skip_value_params)
+        params = self._get_params()
+        for key, value in (self._repr_default_params or {}).items():
+            if params.get(key) == value:
+                del params[key]
+        kwargs_text = kwargs_repr(params, self._repr_skip_value_params)
         return str("%s(%s)") % (cls_text, kwargs_text)
 
     @classmethod
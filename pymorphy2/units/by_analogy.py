@@ -55,14 +55,17 @@ class KnownPrefixAnalyzer(_PrefixAnalyzer):
 
     def init(self, morph):
         super(KnownPrefixAnalyzer, self).init(morph)
-        self.get_prefixes = PrefixMatcher(self.known_prefixes).prefixes
+        self.get_prefixes = self.dict.get_shared(
+            ('prefix_matcher', tuple(self.known_prefixes)),
+            lambda: PrefixMatcher(self.known_prefixes)
+        ).prefixes
 
     def parse(self, word, word_lower, seen_parses):
         result = []
         for prefix, unprefixed_word in self.possible_splits(word_lower):
             method = (self, prefix)
 
-            parses = self.morph.parse(unprefixed_word)
+            parses = self.parse_subword(unprefixed_word)
             for fixed_word, tag, normal_form, score, methods_stack in parses:
 
                 if not tag.is_productive():
@@ -83,7 +86,7 @@ class KnownPrefixAnalyzer(_PrefixAnalyzer):
     def tag(self, word, word_lower, seen_tags):
         result = []
         for prefix, unprefixed_word in self.possible_splits(word_lower):
-            for tag in self.morph.tag(unprefixed_word):
+            for tag in self.tag_subword(unprefixed_word):
                 if not tag.is_productive():
                     continue
                 add_tag_if_not_seen(tag, result, seen_tags)
@@ -162,19 +165,39 @@ class KnownSuffixAnalyzer(AnalogyAnalizerUnit):
 
     Example: бутявкать -> ...вкать
 
+    If ``use_prediction_index`` is True, a merged prediction index
+    keyed by reversed word endings is used (if the dictionary has it)
+    instead of per-prefix prediction DAWGs. Results are the same;
+    the index is slower on typical unknown words, so it is
+    disabled by default.
     """
     class FakeDictionary(DictionaryAnalyzer):
         """ This is just a DictionaryAnalyzer with different __repr__ """
         pass
 
-    def __init__(self, score_multiplier=0.5,  min_word_length=4):
+    dictionary_components = ('prediction_suffixes_dawgs',)
+    _repr_default_params = {'use_prediction_index': False}
+
+    def __init__(self, score_multiplier=0.5,  min_word_length=4,
+                 use_prediction_index=False):
         self.min_word_length = min_word_length
         self.score_multiplier = score_multiplier
+        self.use_prediction_index = use_prediction_index
+        if use_prediction_index:
+            self.dictionary_components += ('prediction_suffixes_index',)
 
     def init(self, morph):
         super(KnownSuffixAnalyzer, self).init(morph)
         self._paradigm_prefixes = list(reversed(list(enumerate(self.dict.paradigm_prefixes))))
         self._prediction_splits = list(reversed(range(1, self._max_suffix_length()+1)))
+        self._prediction_index = None
+        if self.use_prediction_index:
+            self._prediction_index = self.dict.get_prediction_suffixes_index()
+        self._char_substitutes = dict(
+            (key.decode('utf8'), value[1])
+            for key, value in morph.char_substitutes.items()
+        )
+        self._substitutable_chars = frozenset(self._char_substitutes)
 
         self.fake_dict = self.FakeDictionary()
         self.fake_dict.init(morph)
@@ -191,53 +214,29 @@ class KnownSuffixAnalyzer(AnalogyAnalizerUnit):
         if len(word) < self.min_word_length:
             return result
 
-        # smoothing; XXX: isn't max_cnt better?
-        # or maybe use a proper discounting?
-        total_counts = [1] * len(self._paradigm_prefixes)
-
-        for prefix_id, prefix, suffixes_dawg in self._possible_prefixes(word_lower):
-
-            for i in self._prediction_splits:
-
-                # XXX: this should be counted once, not for each prefix
-                word_start, word_end = word_lower[:-i], word_lower[-i:]
+        for prefix_id, hits in self._find_analogies(word_lower):
 
-                para_data = suffixes_dawg.similar_items(word_end, self.morph.char_substitutes)
-                for fixed_suffix, parses in para_data:
-
-                    fixed_word = word_start + fixed_suffix
+            # smoothing; XXX: isn't max_cnt better?
+            # or maybe use a proper discounting?
+            total_count = 1 + sum(hit[0] for hit in hits)
 
-                    for cnt, para_id, idx in parses:
-                        tag = self.dict.build_tag_info(para_id, idx)
+            for cnt, fixed_word, fixed_suffix, tag, para_id, idx in hits:
 
-                        # skip non-productive tags
-                        if not tag.is_productive():
-                            continue
+                # avoid duplicate parses
+                reduced_parse = fixed_word, tag, para_id
+                if reduced_parse in seen_parses:
+                    continue
+                seen_parses.add(reduced_parse)
 
-                        total_counts[prefix_id] += cnt
+                # ok, build the result
+                normal_form = self.dict.build_normal_form(para_id, idx, fixed_word)
+                methods = (
+                    (self.fake_dict, fixed_word, para_id, idx),
+                    (self, fixed_suffix),
+                )
+                score = cnt / total_count * self.score_multiplier
+                result.append((fixed_word, tag, normal_form, score, methods))
 
-                        # avoid duplicate parses
-                        reduced_parse = fixed_word, tag, para_id
-                        if reduced_parse in seen_parses:
-                            continue
-                        seen_parses.add(reduced_parse)
-
-                        # ok, build the result
-                        normal_form = self.dict.build_normal_form(para_id, idx, fixed_word)
-                        methods = (
-                            (self.fake_dict, fixed_word, para_id, idx),
-                            (self, fixed_suffix),
-                        )
-                        parse = (cnt, fixed_word, tag, normal_form, prefix_id, methods)
-                        result.append(parse)
-
-                if total_counts[prefix_id] > 1:
-                    break
-
-        result = [
-            (fixed_word, tag, normal_form, cnt/total_counts[prefix_id] * self.score_multiplier, methods_stack)
-            for (cnt, fixed_word, tag, normal_form, prefix_id, methods_stack) in result
-        ]
         result.sort(key=_cnt_getter, reverse=True)
         return result
 
@@ -249,40 +248,163 @@ class KnownSuffixAnalyzer(AnalogyAnalizerUnit):
         if len(word) < self.min_word_length:
             return result
 
-        for prefix_id, prefix, suffixes_dawg in self._possible_prefixes(word_lower):
+        for prefix_id, hits in self._find_analogies(word_lower):
+            for cnt, fixed_word, fixed_suffix, tag, para_id, idx in hits:
+                if tag in seen_tags:
+                    continue
+                seen_tags.add(tag)
+                result.append((cnt, tag))
 
-            for i in self._prediction_splits:
+        result.sort(reverse=True)
+        return [tag for cnt, tag in result]
 
-                # XXX: end should be counted once, not for each prefix
-                end = word_lower[-i:]
+    def _find_analogies(self, word_lower):
+        """
+        Find known words which have the longest common suffix with
+        ``word_lower``. Return a list of ``(prefix_id, hits)`` tuples
+        (one for each paradigm prefix ``word_lower`` starts with);
+        ``hits`` is a list of
+        ``(cnt, fixed_word, fixed_suffix, tag, para_id, idx)`` tuples
+        with productive tags.
+
+        All paradigm prefixes are handled in a single walk from
+        the longest word suffix to the shortest; a prefix is not
+        checked anymore after a suffix with productive parses
+        is found for it.
+        """
+        if self._prediction_index is not None:
+            return self._find_analogies_indexed(word_lower)
+
+        form_tags = self.dict.form_tags
+        form_offsets = self.dict.form_offsets
+        char_substitutes = self.morph.char_substitutes
+
+        analogies = [(prefix_id, []) for prefix_id in self._possible_prefix_ids(word_lower)]
+        active = [
+            (self.dict.prediction_suffixes_dawgs[prefix_id], hits)
+            for prefix_id, hits in analogies
+        ]
 
-                para_data = suffixes_dawg.similar_items(end, self.morph.char_substitutes)
-                found = False
+        for i in self._prediction_splits:
+            word_start, word_end = word_lower[:-i], word_lower[-i:]
+            not_found = []
 
+            for suffixes_dawg, hits in active:
+                para_data = suffixes_dawg.similar_items(word_end, char_substitutes)
                 for fixed_suffix, parses in para_data:
-                    for cnt, para_id, idx in parses:
+                    fixed_word = word_start + fixed_suffix
 
-                        tag = self.dict.build_tag_info(para_id, idx)
+                    for cnt, para_id, idx in parses:
+                        tag = form_tags[form_offsets[para_id] + idx]
 
+                        # skip non-productive tags
                         if not tag.is_productive():
                             continue
 
-                        found = True
-                        if tag in seen_tags:
-                            continue
-                        seen_tags.add(tag)
-                        result.append((cnt, tag))
-
-                if found:
-                    break
+                        hits.append((cnt, fixed_word, fixed_suffix, tag, para_id, idx))
+
+                if not hits:
+                    not_found.append((suffixes_dawg, hits))
+
+            if not not_found:
+                break
+            active = not_found
+
+        return analogies
+
+    def _find_analogies_indexed(self, word_lower):
+        """
+        The same as :meth:`_find_analogies`, but it uses a prediction
+        index keyed by reversed word endings: all endings of a word
+        are found in a single walk for each spelling variant
+        of the word ending (e.g. with "е" replaced by "ё").
+        """
+        form_tags = self.dict.form_tags
+        form_offsets = self.dict.form_offsets
+        index = self._prediction_index
+
+        prefix_ids = self._possible_prefix_ids(word_lower)
+        analogies = [(prefix_id, []) for prefix_id in prefix_ids]
+        hits_by_prefix = dict(analogies)
+
+        for i, fixed_suffixes in self._find_endings(word_lower):
+            word_start = word_lower[:-i]
+
+            for fixed_suffix in fixed_suffixes:
+                fixed_word = word_start + fixed_suffix
+
+                for prefix_id, cnt, para_id, idx in index[fixed_suffix[::-1]]:
+                    hits = hits_by_prefix.get(prefix_id)
+                    if hits is None:
+                        continue
+
+                    tag = form_tags[form_offsets[para_id] + idx]
+
+                    # skip non-productive tags
+                    if not tag.is_productive():
+                        continue
+
+                    hits.append((cnt, fixed_word, fixed_suffix, tag, para_id, idx))
+
+            for prefix_id, hits in list(hits_by_prefix.items()):
+                if hits:
+                    del hits_by_prefix[prefix_id]
+
+            if not hits_by_prefix:
+                break
+
+        return analogies
+
+    def _find_endings(self, word_lower):
+        """
+        Return a list of ``(length, fixed_suffixes)`` tuples for
+        all word endings found in the prediction index, longest first.
+        ``fixed_suffixes`` are spelling variants of the word ending
+        (e.g. with "е" replaced by "ё"), in the order
+        of ``DAWG.similar_items`` results.
+        """
+        ending = word_lower[-self._prediction_splits[0]:]
+
+        if self._substitutable_chars.isdisjoint(ending):
+            # a single walk is enough
+            return [
+                (len(reversed_ending), [reversed_ending[::-1]])
+                for reversed_ending in reversed(self._prediction_index.prefixes(ending[::-1]))
+            ]
+
+        found_endings = set()
+        for variant in _substitution_variants(ending, self._char_substitutes):
+            found_endings.update(self._prediction_index.prefixes(variant[::-1]))
+
+        res = []
+        for i in sorted(set(len(e) for e in found_endings), reverse=True):
+            fixed_suffixes = [
+                suffix for suffix in _substitution_variants(ending[-i:], self._char_substitutes)
+                if suffix[::-1] in found_endings
+            ]
+            res.append((i, fixed_suffixes))
+        return res
+
+    def _possible_prefix_ids(self, word):
+        return [
+            prefix_id for prefix_id, prefix in self._paradigm_prefixes
+            if word.startswith(prefix)
+        ]
 
-        result.sort(reverse=True)
-        return [tag for cnt, tag in result]
 
-    def _possible_prefixes(self, word):
-        for prefix_id, prefix in self._paradigm_prefixes:
-            if not word.startswith(prefix):
-                continue
+def _substitution_variants(text, char_substitutes, start=0):
+    """
+    Return a list of ``text`` spelling variants, given
+    a ``{char: replacement}`` dict; the order of variants is the same
+    as the order of ``DAWG.similar_items`` results.
 
-            suffixes_dawg = self.dict.prediction_suffixes_dawgs[prefix_id]
-            yield prefix_id, prefix, suffixes_dawg
+    >>> _substitution_variants('еле', {'е': 'ё'})
+    ['еле', 'ёле', 'ёлё', 'елё']
+    """
+    res = [text]
+    for pos in range(start, len(text)):
+        replacement = char_substitutes.get(text[pos])
+        if replacement is not None:
+            variant = text[:pos] + replacement + text[pos+1:]
+            res.extend(_substitution_variants(variant, char_substitutes, pos+1))
+    return res
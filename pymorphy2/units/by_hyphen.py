@@ -41,7 +41,7 @@ class HyphenSeparatedParticleAnalyzer(AnalogyAnalizerUnit):
         for unsuffixed_word, particle in self.possible_splits(word_lower):
             method = (self, particle)
 
-            for fixed_word, tag, normal_form, score, methods_stack in self.morph.parse(unsuffixed_word):
+            for fixed_word, tag, normal_form, score, methods_stack in self.parse_subword(unsuffixed_word):
                 parse = (
                     fixed_word+particle,
                     tag,
@@ -60,7 +60,7 @@ class HyphenSeparatedParticleAnalyzer(AnalogyAnalizerUnit):
     def tag(self, word, word_lower, seen_tags):
         result = []
         for unsuffixed_word, particle in self.possible_splits(word_lower):
-            result.extend(self.morph.tag(unsuffixed_word))
+            result.extend(self.tag_subword(unsuffixed_word))
             # If a word ends with with one of the particles,
             # it can't ends with an another.
             break
@@ -128,7 +128,7 @@ class HyphenAdverbAnalyzer(BaseAnalyzerUnit):
         if len(word) < 5 or not word.startswith('по-'):
             return False
 
-        tags = self.morph.tag(word[3:])
+        tags = self.tag_subword(word[3:])
         return any(set(['ADJF', 'sing', 'datv']) in tag for tag in tags)
 
     def normalized(self, form):
@@ -166,15 +166,18 @@ class HyphenatedWordsAnalyzer(BaseAnalyzerUnit):
         Tag = morph.TagClass
         self._FEATURE_GRAMMEMES = (Tag.PARTS_OF_SPEECH | Tag.NUMBERS |
                                    Tag.CASES | Tag.PERSONS | Tag.TENSES)
-        self._has_skip_prefix = PrefixMatcher(self.skip_prefixes).is_prefixed
+        self._has_skip_prefix = self.dict.get_shared(
+            ('prefix_matcher', tuple(self.skip_prefixes)),
+            lambda: PrefixMatcher(self.skip_prefixes)
+        ).is_prefixed
 
     def parse(self, word, word_lower, seen_parses):
         if not self._should_parse(word_lower):
             return []
 
         left, right = word_lower.split('-', 1)
-        left_parses = self.morph.parse(left)
-        right_parses = self.morph.parse(right)
+        left_parses = self.parse_subword(left)
+        right_parses = self.parse_subword(right)
 
         result = self._parse_as_variable_both(left_parses, right_parses, seen_parses)
 
@@ -16,19 +16,68 @@ class DictionaryAnalyzer(BaseAnalyzerUnit):
     Analyzer unit that analyzes word using dictionary.
     """
 
+    # MorphAnalyzer sets it to True when its result type
+    # (e.g. LazyParse) builds normal forms of dictionary words itself;
+    # parse results then have normal_form=None and a single
+    # (self, fixed_word, para_id, idx) method instead of methods_stack.
+    lazy_normal_forms = False
+
+    dictionary_components = ('words',)
+
+    def init(self, morph):
+        super(DictionaryAnalyzer, self).init(morph)
+        self._substitutable_chars = frozenset(
+            key.decode('utf8') for key in morph.char_substitutes
+        )
+
+    def _similar_items(self, word_lower):
+        # Words without substitutable letters (e.g. without "е")
+        # only need an exact lookup.
+        if self._substitutable_chars.isdisjoint(word_lower):
+            parses = self.dict.words.get(word_lower)
+            return [(word_lower, parses)] if parses is not None else []
+        return self.dict.words.similar_items(word_lower, self.morph.char_substitutes)
+
+    def _similar_item_values(self, word_lower):
+        if self._substitutable_chars.isdisjoint(word_lower):
+            parses = self.dict.words.get(word_lower)
+            return [parses] if parses is not None else []
+        return self.dict.words.similar_item_values(word_lower, self.morph.char_substitutes)
+
     def parse(self, word, word_lower, seen_parses):
         """
         Parse a word using this dictionary.
         """
         res = []
-        para_data = self.dict.words.similar_items(word_lower, self.morph.char_substitutes)
+        para_data = self._similar_items(word_lower)
+
+        # avoid extra attribute lookups;
+        # .build_normal_form and .build_tag_info are unrolled for speed
+        form_offsets = self.dict.form_offsets
+        form_tags = self.dict.form_tags
+        form_prefixes = self.dict.form_prefixes
+        form_suffixes = self.dict.form_suffixes
+        normal_affixes = self.dict.normal_affixes
+
+        if self.lazy_normal_forms:
+            for fixed_word, parses in para_data:
+                for para_id, idx in parses:
+                    tag = form_tags[form_offsets[para_id] + idx]
+                    res.append((fixed_word, tag, None, 1.0, (self, fixed_word, para_id, idx)))
+            return res
 
         for fixed_word, parses in para_data:
             # `fixed_word` is a word with proper substitute (e.g. ё) letters
 
             for para_id, idx in parses:
-                normal_form = self.dict.build_normal_form(para_id, idx, fixed_word)
-                tag = self.dict.build_tag_info(para_id, idx)
+                form_id = form_offsets[para_id] + idx
+                if idx == 0:
+                    normal_form = fixed_word
+                else:
+                    stem = fixed_word[len(form_prefixes[form_id]):len(fixed_word)-len(form_suffixes[form_id])]
+                    normal_prefix, normal_suffix = normal_affixes[para_id]
+                    normal_form = normal_prefix + stem + normal_suffix
+                tag = form_tags[form_id]
                 method = ((self, fixed_word, para_id, idx),)
                 res.append((fixed_word, tag, normal_form, 1.0, method))
 
@@ -39,11 +88,11 @@ class DictionaryAnalyzer(BaseAnalyzerUnit):
         """
         Tag a word using this dictionary.
         """
-        para_data = self.dict.words.similar_item_values(word_lower, self.morph.char_substitutes)
+        para_data = self._similar_item_values(word_lower)
 
         # avoid extra attribute lookups
-        paradigms = self.dict.paradigms
-        gramtab = self.dict.gramtab
+        form_offsets = self.dict.form_offsets
+        form_tags = self.dict.form_tags
 
         # tag known word
         result = []
@@ -51,10 +100,7 @@ class DictionaryAnalyzer(BaseAnalyzerUnit):
             for para_id, idx in parse:
                 # result.append(self.build_tag_info(para_id, idx))
                 # .build_tag_info is unrolled for speed
-                paradigm = paradigms[para_id]
-                paradigm_len = len(paradigm) // 3
-                tag_id = paradigm[paradigm_len + idx]
-                result.append(gramtab[tag_id])
+                result.append(form_tags[form_offsets[para_id] + idx])
 
         return result
 
@@ -65,20 +111,73 @@ class DictionaryAnalyzer(BaseAnalyzerUnit):
         fixed_word, tag, normal_form, score, methods_stack = form
         _, para_id, idx = self._extract_para_info(methods_stack)
 
-        _para = self.dict.paradigms[para_id]
-        stem = self.dict.build_stem(_para, idx, fixed_word)
+        stem = self.dict.build_stem_by_id(para_id, idx, fixed_word)
+        paradigm = self.dict.get_paradigm_info(para_id)
 
+        # ._fix_stack is inlined for speed
+        methods_stack_tail = methods_stack[1:]
         result = []
-        paradigm = self.dict.build_paradigm_info(para_id)  # XXX: reuse _para?
-
+        append = result.append
         for index, (_prefix, _tag, _suffix) in enumerate(paradigm):
             word = _prefix + stem + _suffix
-            new_methods_stack = self._fix_stack(methods_stack, word, para_id, index)
-            parse = (word, _tag, normal_form, 1.0, new_methods_stack)
-            result.append(parse)
+            new_methods_stack = ((self, word, para_id, index),) + methods_stack_tail
+            append((word, _tag, normal_form, 1.0, new_methods_stack))
 
         return result
 
+    def inflect(self, form, required_grammemes):
+        """
+        Inflect a dictionary word without building its lexeme:
+        paradigm forms are filtered and ranked using grammeme bitmasks
+        of their tags. Results are the same as in
+        :meth:`pymorphy2.MorphAnalyzer._inflect`.
+        """
+        fixed_word, tag, normal_form, score, methods_stack = form
+        if len(methods_stack) != 1:
+            return None
+
+        Tag = self.morph.TagClass
+        required_mask = _known_grammemes_mask(Tag, required_grammemes)
+        if required_mask is None:
+            return None  # let the generic code handle unknown grammemes
+
+        original_word, para_id, idx = self._extract_para_info(methods_stack)
+        paradigm = self.dict.get_paradigm_info(para_id)
+        form_tags = [form_tag for _prefix, form_tag, _suffix in paradigm]
+
+        candidates = [index for index, form_tag in enumerate(form_tags)
+                      if form_tag._mask & required_mask == required_mask]
+
+        if not candidates:
+            required_grammemes = Tag.fix_rare_cases(required_grammemes)
+            required_mask = _known_grammemes_mask(Tag, required_grammemes)
+            if required_mask is None:
+                return None
+            candidates = [index for index, form_tag in enumerate(form_tags)
+                          if form_tag._mask & required_mask == required_mask]
+            if not candidates:
+                return []
+
+        if len(candidates) == 1:
+            best_index = candidates[0]
+        else:
+            grammemes_mask = tag._updated_grammemes_mask(required_grammemes)
+
+            # the same as heapq.nlargest(1, ...): the first best form wins
+            best_index, best_similarity = None, None
+            for index in candidates:
+                form_mask = form_tags[index]._mask
+                similarity = (_popcount(grammemes_mask & form_mask) -
+                              0.1 * _popcount(grammemes_mask ^ form_mask))
+                if best_similarity is None or similarity > best_similarity:
+                    best_index, best_similarity = index, similarity
+
+        prefix, form_tag, suffix = paradigm[best_index]
+        stem = self.dict.build_stem_by_id(para_id, idx, fixed_word)
+        word = prefix + stem + suffix
+        new_methods_stack = self._fix_stack(methods_stack, word, para_id, best_index)
+        return [(word, form_tag, normal_form, 1.0, new_methods_stack)]
+
     def normalized(self, form):
         fixed_word, tag, normal_form, score, methods_stack = form
         original_word, para_id, idx = self._extract_para_info(methods_stack)
@@ -101,3 +200,22 @@ class DictionaryAnalyzer(BaseAnalyzerUnit):
     def _fix_stack(self, methods_stack, word, para_id, idx):
         method0 = self, word, para_id, idx
         return (method0,) + methods_stack[1:]
+
+
+def _known_grammemes_mask(Tag, grammemes):
+    """
+    Return a bitmask for ``grammemes`` or None if some of them
+    are not used by any tag.
+    """
+    bits = Tag._GRAMMEME_BITS
+    mask = 0
+    for grammeme in grammemes:
+        bit = bits.get(grammeme)
+        if bit is None:
+            return None
+        mask |= bit
+    return mask
+
+
+def _popcount(n):
+    return bin(n).count('1')
@@ -145,6 +145,127 @@ class TestTagAndParse:
         self.assertTagAndParseAgree(word, morph)
 
 
+class TestBatchMethods:
+    WORDS = ['стали', 'кошка', 'И', 'стали', 'и', 'бутявкать', 'кошка']
+
+    def test_parse_many(self, morph):
+        assert morph.parse_many(self.WORDS) == [morph.parse(w) for w in self.WORDS]
+
+    def test_tag_many(self, morph):
+        assert morph.tag_many(self.WORDS) == [morph.tag(w) for w in self.WORDS]
+
+    def test_normal_forms_many(self, morph):
+        assert morph.normal_forms_many(self.WORDS) == [
+            morph.normal_forms(w) for w in self.WORDS
+        ]
+
+    def test_results_are_not_shared(self, morph):
+        res = morph.parse_many(['кошка', 'кошка'])
+        res[0].pop()
+        assert res[1] == morph.parse('кошка')
+
+    def test_empty(self, morph):
+        assert morph.parse_many([]) == []
+        assert morph.tag_many(iter([])) == []
+
+
+class TestCache:
+    def _parse_info(self, parses):
+        # methods_stack is not compared because it contains
+        # analyzer units bound to different MorphAnalyzer instances
+        return [p[:4] for p in parses]
+
+    def test_results_are_the_same(self, morph):
+        morph_cached = pymorphy2.MorphAnalyzer(cache_size=100)
+        for word in ['стали', 'стали', 'бутявкать', 'И', 'бутявкать']:
+            assert (self._parse_info(morph_cached.parse(word)) ==
+                    self._parse_info(morph.parse(word)))
+            assert morph_cached.tag(word) == morph.tag(word)
+            assert morph_cached.normal_forms(word) == morph.normal_forms(word)
+
+    def test_cache_info(self):
+        morph_cached = pymorphy2.MorphAnalyzer(cache_size=2)
+        for word in ['кот', 'кот', 'пёс', 'ёж', 'кот']:
+            morph_cached.tag(word)
+
+        info = morph_cached.cache_info()['tag']
+        assert (info.hits, info.misses, info.evictions) == (1, 4, 2)
+        assert info.currsize == 2
+
+        morph_cached.cache_clear()
+        assert morph_cached.cache_info()['tag'].currsize == 0
+
+    def test_no_cache(self, morph):
+        assert morph.cache_info() == {}
+
+    def test_cached_results_are_not_shared(self):
+        morph_cached = pymorphy2.MorphAnalyzer(cache_size=10)
+        morph_cached.parse('стали').pop()
+        assert len(morph_cached.parse('стали')) > 1
+
+    def test_methods_are_not_replaced(self):
+        # bound methods stored in the instance would create
+        # reference cycles
+        morph_cached = pymorphy2.MorphAnalyzer(cache_size=10)
+        assert not set(vars(morph_cached)) & {'parse', 'tag', 'normal_forms'}
+
+    def test_pickling(self):
+        morph_cached = pymorphy2.MorphAnalyzer(cache_size=10)
+        morph2 = pickle.loads(pickle.dumps(morph_cached))
+        assert morph2.cache_info()['parse'].maxsize == 10
+        assert morph2.tag('слово') == morph_cached.tag('слово')
+
+
+class TestSubwordCache:
+    WORDS = ['интернет-магазин', 'человек-гора', 'женщина-гора',
+             'псевдомагазин', 'смотри-ка', 'по-западному', 'интернет-магазин']
+
+    def _get_unit(self, morph, cls):
+        return next(unit for unit, is_terminal in morph._units
+                    if isinstance(unit, cls))
+
+    def test_results_are_the_same(self, morph):
+        units = [
+            DictionaryAnalyzer(),
+            KnownPrefixAnalyzer(lang.ru.KNOWN_PREFIXES),
+            HyphenatedWordsAnalyzer(lang.ru.KNOWN_PREFIXES),
+        ]
+        morph_not_cached = pymorphy2.MorphAnalyzer(units=units, subword_cache_size=0)
+        morph_cached = pymorphy2.MorphAnalyzer(units=units)
+        unit = self._get_unit(morph_not_cached, HyphenatedWordsAnalyzer)
+        assert unit.subword_cache_info() == {}
+
+        for word in self.WORDS:
+            assert ([p[:4] for p in morph_cached.parse(word)] ==
+                    [p[:4] for p in morph_not_cached.parse(word)])
+            assert morph_cached.tag(word) == morph_not_cached.tag(word)
+
+    def test_cache_info(self):
+        morph = pymorphy2.MorphAnalyzer()
+        for word in ['человек-гора', 'человек-гора', 'женщина-гора']:
+            morph.parse(word)
+
+        unit = self._get_unit(morph, HyphenatedWordsAnalyzer)
+        info = unit.subword_cache_info()['parse_subword']
+        # "гора" is parsed only once
+        assert (info.hits, info.misses) == (3, 3)
+        assert unit.subword_cache_info()['parse_subword'].maxsize == 10000
+
+        morph.cache_clear()
+        assert unit.subword_cache_info()['parse_subword'].currsize == 0
+
+    def test_cache_size(self):
+        morph = pymorphy2.MorphAnalyzer(subword_cache_size=5)
+        morph2 = pickle.loads(pickle.dumps(morph))
+        unit = self._get_unit(morph2, HyphenatedWordsAnalyzer)
+        assert unit.subword_cache_info()['tag_subword'].maxsize == 5
+        assert 'tag_subword' not in vars(unit)
+
+    def test_repr_is_unchanged(self, morph):
+        unit = self._get_unit(morph, KnownPrefixAnalyzer)
+        assert 'cache' not in repr(unit)
+
+
 class TestTagMethod:
     def _tagged_as(self, tags, cls):
         return any(tag.POS == cls for tag in tags)
@@ -158,6 +279,16 @@ class TestTagMethod:
         self.assertNotTaggedAs(word, cls, morph)
 
 
+class TestDictionaryLookup:
+    @pytest.mark.parametrize('word', ['ежик', 'ёжик', 'кот', 'стол', 'бутявка', 'ещё'])
+    def test_same_as_similar_items(self, word, morph):
+        unit = DictionaryAnalyzer()
+        unit.init(morph)
+        words = morph.dictionary.words
+        assert unit._similar_items(word) == words.similar_items(word, morph.char_substitutes)
+        assert unit._similar_item_values(word) == words.similar_item_values(word, morph.char_substitutes)
+
+
 class TestParse:
     def _parsed_as(self, parse, cls):
         return any(p[1].POS==cls for p in parse)
@@ -335,3 +466,33 @@ def test_iter_known_word_parses(morph):
         (p.word=='привет' and isinstance(p.methods_stack[0][0], DictionaryAnalyzer))
         for p in parses
     ), parses
+
+
+def test_preload(morph):
+    import gc
+    from pymorphy2 import analyzer
+    try:
+        preloaded = pymorphy2.preload()
+        if hasattr(gc, 'freeze'):
+            assert gc.get_freeze_count() > 0
+    finally:
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+
+    try:
+        assert preloaded.dictionary is morph.dictionary
+        assert preloaded.dictionary.loaded_components() == list(
+            preloaded.dictionary.LAZY_COMPONENTS)
+        assert pymorphy2.MorphAnalyzer().dictionary is preloaded.dictionary
+        assert preloaded.tag('стиль') == morph.tag('стиль')
+
+        # the same dictionary is preloaded once
+        preloaded2 = pymorphy2.preload(lang='ru', freeze=False)
+        assert list(analyzer._preloaded.values()) == [preloaded2]
+
+        pymorphy2.release_preloaded(path='/tmp/no-such-dict')
+        assert len(analyzer._preloaded) == 1
+        pymorphy2.release_preloaded(lang='ru')
+        assert analyzer._preloaded == {}
+    finally:
+        pymorphy2.release_preloaded()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import pytest
+
+import pymorphy2
+from pymorphy2.analyzer import LazyParse
+
+WORDS = 'Мама мыла раму , а стали стали сталью бутявкать мама'.split()
+
+
+def test_parse_batch(morph):
+    batch = morph.parse_batch(iter(WORDS))
+    assert len(batch) == len(WORDS)
+    assert len(batch.offsets) == len(WORDS) + 1
+    assert batch.offsets[-1] == len(batch.tag_ids) == len(batch.scores)
+
+    for index, word in enumerate(WORDS):
+        parses = morph.parse(word)
+        assert batch.get_tags(index) == [p.tag for p in parses]
+        assert batch.get_scores(index) == [p.score for p in parses]
+        assert batch[index] == parses
+
+    assert [len(parses) for parses in batch] == [len(morph.parse(w)) for w in WORDS]
+
+
+def test_tag_ids(morph):
+    batch = morph.parse_batch(['стали', 'Vasya'])
+    gramtab = morph.dictionary.gramtab
+
+    start, end = batch.offsets[0], batch.offsets[1]
+    for row in range(start, end):
+        tag_id = batch.tag_ids[row]
+        assert gramtab[tag_id] == batch.tags[tag_id]
+        assert batch.para_ids[row] != -1
+        assert morph.dictionary.build_tag_info(batch.para_ids[row], batch.idxs[row]) == batch.tags[tag_id]
+
+    # LATN tag is not in the dictionary
+    row = batch.offsets[1]
+    assert batch.tag_ids[row] >= len(gramtab)
+    assert batch.tags[batch.tag_ids[row]] == morph.tag('Vasya')[0]
+    assert batch.para_ids[row] == batch.idxs[row] == -1
+
+
+@pytest.mark.parametrize('result_type', [None, LazyParse])
+def test_result_types(result_type):
+    morph = pymorphy2.MorphAnalyzer(result_type=result_type)
+    batch = morph.parse_batch(WORDS)
+    for index, word in enumerate(WORDS):
+        assert batch.get_parses(index) == morph.parse(word)
+
+
+def test_parses_are_restored(morph):
+    batch = morph.parse_batch(['стали', 'стали', 'ёж', 'еж', 'бутявкать'])
+    # only parses which can't be restored from columns are stored
+    stored = [p.word for p in batch._parses]
+    assert stored.count('бутявкать') == len(morph.parse('бутявкать'))
+    assert stored.count('ёж') == len(morph.parse('еж'))  # е is replaced
+    assert len(stored) == len(morph.parse('бутявкать')) + len(morph.parse('еж'))
+
+
+def test_columns(morph):
+    batch = morph.parse_batch(['мама', 'мама', 'рама'])
+    columns = batch.columns()
+    token_ids = list(columns['token_id'])
+    assert len(token_ids) == len(columns['score'])
+    assert token_ids == sorted(token_ids)
+    assert token_ids.count(0) == len(morph.parse('мама'))
+    assert token_ids[-1] == 2
+
+
+def test_numpy(morph):
+    np = pytest.importorskip('numpy')
+    batch = morph.parse_batch(WORDS)
+    scores = np.asarray(batch.scores)
+    assert scores.shape == (len(batch.scores),)
+    assert scores[0] == batch.scores[0]
+
+
+def test_empty(morph):
+    batch = morph.parse_batch([])
+    assert len(batch) == 0
+    assert list(batch.offsets) == [0]
+    assert list(batch.token_ids()) == []
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
+import json
 import logging
 
 import pytest
@@ -50,3 +51,80 @@ def test_parse_basic(tmpdir, capsys):
         """.strip()
     finally:
         logging.raiseExceptions = True
+
+
+@pytest.mark.parametrize('args', [
+    ["--jobs", "2", "--batch-size", "1"],
+    ["--jobs", "1", "--batch-size", "2"],
+    ["--cache", "0", "--batch-size", "3"],
+])
+def test_parse_jobs(tmpdir, capsys, args):
+    text = u"крот пришел\nмама мыла раму\n\nстали стали\n"
+    p = tmpdir.join('words.txt')
+    p.write_text(text, encoding='utf8')
+
+    run_pymorphy2(["parse", "-lt", str(p)])
+    expected, err = capsys.readouterr()
+
+    run_pymorphy2(["parse", "-lt"] + args + [str(p)])
+    out, err = capsys.readouterr()
+    assert out == expected
+    assert len(out.splitlines()) == 7
+
+
+def _parse_file(tmpdir, capsys, text, args):
+    p = tmpdir.join('words.txt')
+    p.write_text(text, encoding='utf8')
+    run_pymorphy2(["parse"] + args + [str(p)])
+    out, err = capsys.readouterr()
+    return out
+
+
+@pytest.mark.parametrize('batch_size', ["1", "1000"])
+def test_parse_json(tmpdir, capsys, batch_size):
+    out = _parse_file(tmpdir, capsys, u'крот "пришел"\n\nкрот\n',
+                      ["--format", "json", "--batch-size", batch_size])
+    res = json.loads(out)
+    assert [r['word'] for r in res] == [u'крот', u'"', u'пришел', u'"', u'крот']
+    assert res[0]['parses'] == [
+        {'normal_form': u'крот', 'score': 1.0, 'tag': 'NOUN,anim,masc sing,nomn'}
+    ]
+
+
+def test_parse_json_empty(tmpdir, capsys):
+    out = _parse_file(tmpdir, capsys, u'\n', ["--format", "json"])
+    assert json.loads(out) == []
+
+
+def test_parse_jsonl(tmpdir, capsys, morph):
+    out = _parse_file(tmpdir, capsys, u'крот\nстали\n', ["-ls", "--format", "jsonl"])
+    lines = out.splitlines()
+    assert len(lines) == 2
+    res = json.loads(lines[1])
+    assert res['word'] == u'стали'
+    assert [p['normal_form'] for p in res['parses']] == morph.normal_forms(u'стали')
+    assert set(res['parses'][0].keys()) == set(['normal_form', 'score'])
+
+
+def test_parse_tsv(tmpdir, capsys, morph):
+    out = _parse_file(tmpdir, capsys, u'крот стали\n', ["-t", "--format", "tsv"])
+    rows = [line.split('\t') for line in out.splitlines()]
+    assert rows[0] == [u'крот', 'NOUN,anim,masc sing,nomn']
+    assert [row[0] for row in rows[1:]] == [u'стали'] * len(morph.tag(u'стали'))
+
+
+def test_parse_bad_format():
+    with pytest.raises(docopt.DocoptExit):
+        run_pymorphy2(["parse", "--format", "xml"])
+
+
+@pytest.mark.parametrize('args', [
+    ["--batch-size", "0"],
+    ["--batch-size", "-1"],
+    ["--batch-size", "x"],
+    ["--jobs", "-1"],
+    ["--jobs", "two"],
+])
+def test_parse_bad_numbers(args):
+    with pytest.raises(docopt.DocoptExit):
+        run_pymorphy2(["parse"] + args)
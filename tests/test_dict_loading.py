@@ -1,9 +1,33 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
+import array
+import gc
+import os
+import pickle
+import shutil
+import struct
+import sys
+import weakref
 import pytest
 
 import pymorphy2
 from pymorphy2.analyzer import lang_dict_path
+from pymorphy2.opencorpora_dict import get_dictionary, release_dictionary
+from pymorphy2.opencorpora_dict.storage import (
+    build_tables, StringTable, FlatParadigms, IdTable
+)
+
+
+def test_lang_dict_paths_cached():
+    from pymorphy2.analyzer import _lang_dict_paths, refresh_lang_dict_paths
+    path = lang_dict_path('ru')
+    assert _lang_dict_paths() is _lang_dict_paths()
+
+    refresh_lang_dict_paths()
+    assert lang_dict_path('ru') == path
+
+    with pytest.raises(ValueError):
+        lang_dict_path('xx')
 
 
 def test_old_dictionaries_supported():
@@ -52,3 +76,279 @@ def test_nonmatching_language():
     m = pymorphy2.MorphAnalyzer(path=ru_path, lang='uk')
     assert 'Init' in m.parse('Ї')[0].tag
     assert m.lang == 'uk'
+
+
+def _read_paradigms_as_list(filename):
+    paradigms = []
+    with open(filename, 'rb') as f:
+        paradigms_count = struct.unpack(str("<H"), f.read(2))[0]
+        for x in range(paradigms_count):
+            paradigm_len = struct.unpack(str("<H"), f.read(2))[0]
+            para = array.array(str("H"))
+            para.fromfile(f, paradigm_len)
+            paradigms.append(list(para))
+    return paradigms
+
+
+def test_load_paradigms_byteswap(tmpdir, monkeypatch):
+    from pymorphy2.opencorpora_dict.storage import _load_paradigms
+    paradigms = [[1, 2, 300], [4, 5, 6, 7, 8, 1000]]
+
+    # paradigms.array data is little-endian. A big-endian machine reads
+    # it the same way as this machine reads byteswapped data.
+    filename = str(tmpdir.join('paradigms.array'))
+    with open(filename, 'wb') as f:
+        f.write(struct.pack(str("<H"), len(paradigms)))
+        for para in paradigms:
+            f.write(struct.pack(str(">H"), len(para)))
+            f.write(struct.pack(str(">%dH") % len(para), *para))
+
+    monkeypatch.setattr(sys, 'byteorder', 'big' if sys.byteorder == 'little' else 'little')
+    assert [list(para) for para in _load_paradigms(filename)] == paradigms
+
+
+def test_flat_paradigms(morph):
+    paradigms = morph.dictionary.paradigms
+    assert isinstance(paradigms, FlatParadigms)
+
+    filename = os.path.join(lang_dict_path('ru'), 'paradigms.array')
+    expected = _read_paradigms_as_list(filename)
+    assert len(paradigms) == len(expected)
+    assert [list(para) for para in paradigms] == expected
+    assert list(paradigms.lengths) == [len(para) // 3 for para in expected]
+
+
+def test_form_tables(morph):
+    d = morph.dictionary
+    assert len(d.form_tags) == sum(d.paradigms.lengths)
+
+    for para_id in [0, 1, len(d.paradigms) // 2, len(d.paradigms) - 1]:
+        paradigm = d.paradigms[para_id]
+        paradigm_len = len(paradigm) // 3
+        expected = [
+            (d.paradigm_prefixes[paradigm[paradigm_len*2 + idx]],
+             d.gramtab[paradigm[paradigm_len + idx]],
+             d.suffixes[paradigm[idx]])
+            for idx in range(paradigm_len)
+        ]
+        assert d.build_paradigm_info(para_id) == expected
+        assert d.normal_affixes[para_id] == (expected[0][0], expected[0][2])
+
+
+def test_mmap_form_tables(dict_with_tables, morph):
+    d = pymorphy2.MorphAnalyzer(dict_with_tables, use_mmap=True).dictionary
+    assert list(d.form_offsets) == list(morph.dictionary.form_offsets)
+    assert list(d.form_tags) == morph.dictionary.form_tags
+    assert list(d.form_prefixes) == morph.dictionary.form_prefixes
+    assert d.form_suffixes[10:20] == morph.dictionary.form_suffixes[10:20]
+    assert d.normal_affixes == morph.dictionary.normal_affixes
+
+
+def test_build_stem(morph):
+    d = morph.dictionary
+    for word, (para_id, idx) in d.words.items('стали'):
+        stem = d.build_stem(d.paradigms[para_id], idx, word)
+        assert stem == d.build_stem_by_id(para_id, idx, word)
+        assert word.startswith(stem)
+
+
+def test_tag_id(morph):
+    d = morph.dictionary
+    for tag_id, tag in enumerate(d.gramtab[:100]):
+        assert d.gramtab[d.tag_id(tag)] is tag
+        assert d.tag_id(tag) <= tag_id
+    assert d.tag_id(morph.parse('стали')[0].tag) is not None
+    assert d.tag_id(morph.TagClass('LATN')) is None
+
+
+def test_paradigm_info_cache(morph):
+    d = morph.dictionary
+    para_id = len(d.paradigms) // 2
+    info = d.get_paradigm_info(para_id)
+    assert d.get_paradigm_info(para_id) is info
+    assert list(info) == d.build_paradigm_info(para_id)
+    assert len(d._paradigm_info_cache) <= d.paradigm_info_cache_size
+
+
+def test_lazy_components():
+    from pymorphy2 import units
+    # analyzers share dictionaries; make sure a new one is loaded
+    release_dictionary(lang_dict_path('ru'))
+    m = pymorphy2.MorphAnalyzer(units=[units.DictionaryAnalyzer()])
+    assert m.dictionary.loaded_components() == ['words']
+    assert m.tag('стиль')[0].POS == 'NOUN'
+    assert 'prediction_suffixes_dawgs' not in vars(m.dictionary)
+
+    # components are loaded on first access
+    assert len(m.dictionary.prediction_suffixes_dawgs) == len(m.dictionary.paradigm_prefixes)
+    assert m.dictionary.loaded_components() == ['words', 'prediction_suffixes_dawgs']
+
+    # the index is None if the dictionary doesn't have it
+    m.dictionary.load_components()
+    assert m.dictionary.loaded_components() == list(m.dictionary.LAZY_COMPONENTS)
+    assert m.dictionary.prediction_suffixes_index is None
+
+
+def test_shared_dictionary(tmpdir):
+    path = str(tmpdir.join('ru'))
+    shutil.copytree(lang_dict_path('ru'), path)
+
+    m1 = pymorphy2.MorphAnalyzer(path)
+    m2 = pymorphy2.MorphAnalyzer(path)
+    assert m1.dictionary is m2.dictionary
+    assert m1.prob_estimator is m2.prob_estimator
+    assert get_dictionary(path) is m1.dictionary
+
+    release_dictionary(path)
+    m3 = pymorphy2.MorphAnalyzer(path)
+    assert m3.dictionary is not m1.dictionary
+    assert m3.tag('стиль') == m1.tag('стиль')
+
+    # dictionaries are freed when they are no longer used
+    dictionary_ref = weakref.ref(m3.dictionary)
+    del m1, m2, m3
+    gc.collect()
+    assert dictionary_ref() is None
+
+
+def test_prediction_index_missing(morph):
+    assert morph.dictionary.get_prediction_suffixes_index() is None
+    assert morph.normal_forms('бутявкать')[0] == 'бутявкать'
+
+
+@pytest.fixture(scope='module')
+def dict_with_tables(tmpdir_factory):
+    path = str(tmpdir_factory.mktemp('dicts').join('ru'))
+    shutil.copytree(lang_dict_path('ru'), path)
+    build_tables(path)
+    return path
+
+
+def test_mmap_tables(dict_with_tables, morph):
+    m = pymorphy2.MorphAnalyzer(dict_with_tables, use_mmap=True)
+    assert isinstance(m.dictionary.suffixes, StringTable)
+    assert isinstance(m.dictionary.paradigms, FlatParadigms)
+    assert isinstance(m.dictionary.form_tags, IdTable)
+    assert isinstance(m.dictionary.form_offsets, memoryview)
+
+    assert m.dictionary.gramtab == morph.dictionary.gramtab
+    assert list(m.dictionary.suffixes) == list(morph.dictionary.suffixes)
+    assert [list(para) for para in m.dictionary.paradigms] == [
+        list(para) for para in morph.dictionary.paradigms
+    ]
+
+    for word in ['стали', 'наистарейший', 'бутявкать']:
+        assert m.normal_forms(word) == morph.normal_forms(word)
+        lexeme = [p.word for p in m.parse(word)[0].lexeme]
+        assert lexeme == [p.word for p in morph.parse(word)[0].lexeme]
+
+
+def test_mmap_tables_pickling(dict_with_tables):
+    m = pymorphy2.MorphAnalyzer(dict_with_tables, use_mmap=True)
+    m2 = pickle.loads(pickle.dumps(m))
+    assert isinstance(m2.dictionary.suffixes, StringTable)
+
+
+def test_mmap_tables_missing():
+    with pytest.warns(UserWarning, match='tables.bin'):
+        m = pymorphy2.MorphAnalyzer(use_mmap=True)
+    assert m.tag('стиль')[0].POS == 'NOUN'
+
+
+def test_word_probabilities(tmpdir, morph):
+    from pymorphy2.dawg import assert_can_create, ConditionalProbDistRecordDAWG
+    from pymorphy2.opencorpora_dict.probability import convert_cpd_dawg
+    try:
+        assert_can_create()
+    except NotImplementedError as e:
+        raise pytest.skip(str(e))
+
+    path = str(tmpdir.join('ru'))
+    shutil.copytree(lang_dict_path('ru'), path)
+    convert_cpd_dawg(path)
+
+    m = pymorphy2.MorphAnalyzer(path)
+    assert isinstance(m.prob_estimator.p_t_given_w, ConditionalProbDistRecordDAWG)
+
+    for word in ['стали', 'на', 'мама', 'бутявкать', 'человек-гора', 'XVI', 'II', 'C']:
+        assert [p[:4] for p in m.parse(word)] == [p[:4] for p in morph.parse(word)]
+        assert m.tag(word) == morph.tag(word)
+
+    # tags which are not in the gramtab keep their probabilities
+    assert [p.score for p in m.parse('XVI')] == [p.score for p in morph.parse('XVI')]
+    assert m.parse('XVI')[0].score > 0.9
+
+    words = ['стали', 'на', 'бутявкать']
+    tags = [m.tag(word) for word in words]
+    assert m.prob_estimator.tag_probs_many(words, tags) == [
+        morph.prob_estimator.tag_probs(word, word_tags)
+        for word, word_tags in zip(words, tags)
+    ]
+
+
+def test_prob_estimator_subclass(morph):
+    from pymorphy2.analyzer import ProbabilityEstimator
+
+    class MyEstimator(ProbabilityEstimator):
+        def __init__(self, dict_path):
+            super(MyEstimator, self).__init__(dict_path)
+
+    m = pymorphy2.MorphAnalyzer(probability_estimator_cls=MyEstimator)
+    assert isinstance(m.prob_estimator, MyEstimator)
+    assert [p[:4] for p in m.parse('стали')] == [p[:4] for p in morph.parse('стали')]
+
+
+@pytest.fixture(scope='module')
+def reordered_dict(tmpdir_factory):
+    """ A copy of the dictionary with tags stored in reverse gramtab order """
+    from pymorphy2.utils import json_read, json_write
+    from pymorphy2.opencorpora_dict.storage import load_meta, _load_paradigms
+
+    path = str(tmpdir_factory.mktemp('dicts').join('ru-reordered'))
+    shutil.copytree(lang_dict_path('ru'), path)
+    _f = lambda p: os.path.join(path, p)
+
+    for filename in load_meta(_f('meta.json'))['gramtab_formats'].values():
+        json_write(_f(filename), json_read(_f(filename))[::-1])
+
+    paradigms = _load_paradigms(_f('paradigms.array'))
+    gramtab_len = len(json_read(_f('gramtab-opencorpora-int.json')))
+    with open(_f('paradigms.array'), 'wb') as f:
+        f.write(struct.pack(str("<H"), len(paradigms)))
+        for para in paradigms:
+            para = list(para)
+            forms_count = len(para) // 3
+            for index in range(forms_count, forms_count*2):
+                para[index] = gramtab_len - 1 - para[index]
+            f.write(struct.pack(str("<H"), len(para)))
+            f.write(struct.pack(str("<%dH") % len(para), *para))
+    return path
+
+
+def test_gramtab_order(reordered_dict, morph):
+    from pymorphy2.dawg import assert_can_create
+    from pymorphy2.opencorpora_dict.probability import convert_cpd_dawg
+
+    m = pymorphy2.MorphAnalyzer(reordered_dict)
+    assert m.dictionary.gramtab == morph.dictionary.gramtab[::-1]
+
+    words = ['стали', 'на', 'мама', 'бутявкать', 'человек-гора', 'Vasya']
+    batch1, batch2 = morph.parse_batch(words), m.parse_batch(words)
+    for index, word in enumerate(words):
+        assert [p[:4] for p in m.parse(word)] == [p[:4] for p in morph.parse(word)]
+        assert batch2.get_tags(index) == batch1.get_tags(index)
+
+    try:
+        assert_can_create()
+    except NotImplementedError:
+        return
+
+    # P(t|w) data keyed by word uses gramtab ids of each dictionary
+    path = reordered_dict + '-orig'
+    shutil.copytree(lang_dict_path('ru'), path)
+    convert_cpd_dawg(path)
+    convert_cpd_dawg(reordered_dict)
+    m1, m2 = pymorphy2.MorphAnalyzer(path), pymorphy2.MorphAnalyzer(reordered_dict)
+    for word in words:
+        assert [p[:4] for p in m1.parse(word)] == [p[:4] for p in morph.parse(word)]
+        assert [p[:4] for p in m2.parse(word)] == [p[:4] for p in morph.parse(word)]
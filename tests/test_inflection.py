@@ -109,3 +109,26 @@ def test_best_guess(word, grammemes, result, morph):
 ])
 def test_not_informal(word, grammemes, result, morph):
     assert_first_inflected_variant(word, grammemes, result, morph)
+
+
+@pytest.mark.parametrize("word", ["стали", "суслики", "гулял", "орла", "лесу", "красивейший"])
+@pytest.mark.parametrize("grammemes", [
+    ["datv"], ["plur", "gent"], ["loc2"], ["gen2"], ["past", "femn"],
+    ["INFN"], ["NOUN"], ["Supr"],
+])
+def test_dictionary_inflection_uses_no_lexeme(word, grammemes, morph):
+    # DictionaryAnalyzer inflects words without building a lexeme;
+    # results must be the same as for a lexeme-based inflection.
+    for p in morph.parse(word):
+        analyzer = p.methods_stack[-1][0]
+        fast_result = analyzer.inflect(p, set(grammemes))
+        if fast_result is None:
+            continue
+        possible = [f for f in p.lexeme if set(grammemes) <= f.tag.grammemes]
+        if not possible:
+            grammemes_fixed = morph.TagClass.fix_rare_cases(grammemes)
+            possible = [f for f in p.lexeme if grammemes_fixed <= f.tag.grammemes]
+        assert bool(fast_result) == bool(possible)
+        if fast_result:
+            assert fast_result[0][:4] in [f[:4] for f in possible]
+            assert p.inflect(set(grammemes))[:4] == fast_result[0][:4]
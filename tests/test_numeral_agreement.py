@@ -77,3 +77,15 @@ def test_plural_num(word, num, result, morph):
     parsed = morph.parse(word)
     assert len(parsed)
     assert parsed[0].make_agree_with_number(num).word == result
+
+
+def test_plural_nums(morph):
+    nums = [0, 1, 2, 4, 5, 11, 12, 21, 24, 101, 111, 5624, 7613]
+    parsed = morph.parse("лопата")[0]
+    forms = parsed.make_agree_with_numbers(nums)
+    assert forms == [parsed.make_agree_with_number(num) for num in nums]
+    assert [form.word for form in forms[:5]] == [
+        "лопат", "лопата", "лопаты", "лопаты", "лопат"
+    ]
+    assert forms[0] is forms[4]
+    assert parsed.make_agree_with_numbers([]) == []
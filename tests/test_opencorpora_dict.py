@@ -11,7 +11,7 @@ from pymorphy2.opencorpora_dict.compile import (
 )
 from pymorphy2.opencorpora_dict.parse import parse_opencorpora_xml
 from pymorphy2.dawg import assert_can_create
-from pymorphy2 import lang
+from pymorphy2 import lang, units
 
 
 class TestToyDictionary:
@@ -58,6 +58,7 @@ class TestToyDictionary:
             'min_paradigm_popularity': 0,
             'min_ending_freq': 0,
             'paradigm_prefixes': lang.ru.PARADIGM_PREFIXES,
+            'build_prediction_index': True,
         }
         convert_to_pymorphy2(self.XML_PATH, out_path,
                              source_name='toy', language_code='ru',
@@ -78,6 +79,49 @@ class TestToyDictionary:
         assert morph.normal_forms('абсурднее') == ['абсурдный']
         assert morph.normal_forms('а') == ['а']
 
+        # tables for mmap loading are created
+        morph_mmap = pymorphy2.MorphAnalyzer(out_path, use_mmap=True)
+        assert morph_mmap.normal_forms('абсурднее') == ['абсурдный']
+        assert morph_mmap.tag('ёжиться') == [morph.TagClass('INFN,impf,intr')]
+
+        # merged prediction index gives the same results
+        indexed_unit = units.KnownSuffixAnalyzer(use_prediction_index=True)
+        assert 'use_prediction_index=True' in repr(indexed_unit)
+        assert 'use_prediction_index' not in repr(units.KnownSuffixAnalyzer())
+        morph_indexed = pymorphy2.MorphAnalyzer(out_path, units=[
+            units.DictionaryAnalyzer(), indexed_unit
+        ])
+        assert morph_indexed._units[1][0].use_prediction_index
+        assert 'prediction_suffixes_index' in morph_indexed.dictionary.loaded_components()
+        assert morph_indexed.dictionary.get_prediction_suffixes_index() is not None
+        morph_plain = pymorphy2.MorphAnalyzer(out_path, units=[
+            units.DictionaryAnalyzer(), units.KnownSuffixAnalyzer()
+        ])
+        words = ['бутявкать', 'наибутявейший', 'побутявкать', 'ёжистый', 'абсурдее']
+        assert any(morph_indexed.parse(word) for word in words)
+        for word in words:
+            assert [p[:4] for p in morph_indexed.parse(word)] == [
+                p[:4] for p in morph_plain.parse(word)
+            ]
+            assert morph_indexed.tag(word) == morph_plain.tag(word)
+
+    def test_prediction_index_is_optional(self, tmpdir):
+        try:
+            assert_can_create()
+        except NotImplementedError as e:
+            raise pytest.skip(str(e))
+
+        out_path = str(tmpdir.join('dicts'))
+        options = {'paradigm_prefixes': lang.ru.PARADIGM_PREFIXES}
+        convert_to_pymorphy2(self.XML_PATH, out_path,
+                             source_name='toy', language_code='ru',
+                             overwrite=True, compile_options=options)
+        assert not os.path.exists(os.path.join(out_path, 'prediction-suffixes-index.dawg'))
+
+        morph = pymorphy2.MorphAnalyzer(out_path)
+        assert morph.dictionary.get_prediction_suffixes_index() is None
+        assert morph.tag('ёжиться') == [morph.TagClass('INFN,impf,intr')]
+
 
 class TestToParadigm(object):
 
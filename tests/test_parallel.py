@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import pytest
+
+from pymorphy2 import parallel
+
+TOKENS = 'Мама мыла раму , а стали стали сталью бутявкать мама'.split() * 5
+
+
+def _expected_parses(morph, tokens):
+    return [
+        [(p.word, str(p.tag), p.normal_form, p.score) for p in morph.parse(token)]
+        for token in tokens
+    ]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_parse_corpus(morph, jobs):
+    res = list(parallel.parse_corpus(TOKENS, morph, jobs=jobs, chunk_size=3))
+    assert res == _expected_parses(morph, TOKENS)
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_lemmatize_corpus(morph, jobs):
+    res = list(parallel.lemmatize_corpus(iter(TOKENS), morph, jobs=jobs, chunk_size=7))
+    assert res == [morph.parse(token)[0].normal_form for token in TOKENS]
+    assert res[:3] == ['мама', 'мыло', 'рама']
+
+
+def test_spawn_start_method(morph):
+    res = list(parallel.lemmatize_corpus(TOKENS[:10], morph, jobs=2,
+                                         chunk_size=4, start_method='spawn'))
+    assert res == [morph.parse(token)[0].normal_form for token in TOKENS[:10]]
+
+
+def test_empty_corpus(morph):
+    assert list(parallel.parse_corpus([], morph, jobs=2)) == []
+
+
+def test_bad_chunk_size(morph):
+    with pytest.raises(ValueError):
+        parallel.parse_corpus(TOKENS, morph, chunk_size=0)
+
+
+
+def _exit_worker(morph, chunk):
+    raise SystemExit()
+
+
+def test_restarted_fork_workers(morph):
+    if 'fork' not in parallel._get_all_start_methods():
+        pytest.skip("fork is not available")
+
+    pool = parallel._create_pool(morph, 1, 'fork')
+    try:
+        # the worker exits; the pool starts a new one
+        # which must use the same analyzer
+        pool.apply_async(parallel._call_in_worker, (_exit_worker, []))
+        res = pool.apply_async(parallel._call_in_worker,
+                               (parallel._lemmatize_chunk, ['стали']))
+        assert res.get(timeout=30) == [morph.parse('стали')[0].normal_form]
+    finally:
+        pool.terminate()
+        pool.join()
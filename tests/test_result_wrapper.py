@@ -1,5 +1,15 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
+import pytest
+
+import pymorphy2
+from pymorphy2.analyzer import LazyParse
+
+
+@pytest.fixture(scope='module')
+def morph_lazy():
+    return pymorphy2.MorphAnalyzer(result_type=LazyParse)
+
 
 def test_indexing(morph):
     assert len(morph.parse('стреляли')) == 1
@@ -31,3 +41,30 @@ def test_is_known(morph):
 
 def test_normalized(morph):
     assert morph.parse('стреляли')[0].normalized.word == 'стрелять'
+
+
+@pytest.mark.parametrize('word', ['стреляли', 'стали', 'бутявкать', 'смотри-ка'])
+def test_lazy_parse(morph, morph_lazy, word):
+    parses = morph.parse(word)
+    lazy_parses = morph_lazy.parse(word)
+    assert all(isinstance(p, LazyParse) for p in lazy_parses)
+    assert [p[:4] for p in lazy_parses] == [p[:4] for p in parses]
+    assert [p.normal_form for p in lazy_parses] == [p.normal_form for p in parses]
+    assert [len(p.methods_stack) for p in lazy_parses] == [len(p.methods_stack) for p in parses]
+    assert morph_lazy.normal_forms(word) == morph.normal_forms(word)
+
+
+def test_lazy_parse_api(morph_lazy):
+    p = morph_lazy.parse('стреляли')[0]
+    assert not hasattr(p, '__dict__')
+
+    word, tag, normal_form, score, methods_stack = p
+    assert (word, normal_form, len(p)) == ('стреляли', 'стрелять', 5)
+    assert p == tuple(p)
+    assert hash(p) == hash(tuple(p))
+
+    assert p.inflect(set(['femn'])).word == 'стреляла'
+    assert p.normalized.word == 'стрелять'
+    assert p.is_known
+    assert 'стреляла' in [f.word for f in p.lexeme]
+    assert repr(p).startswith('LazyParse(word=')
@@ -27,6 +27,26 @@ def test_cls(tag, cls, Tag):
     assert Tag(tag).POS == cls
 
 
+def test_interning(Tag, morph):
+    assert Tag('NOUN anim,plur') is Tag('NOUN anim,plur')
+    assert Tag('NOUN,anim,plur') is not Tag('NOUN anim,plur')
+
+    tag = morph.parse('стали')[0].tag
+    assert Tag(str(tag)) is tag
+    assert pymorphy2.MorphAnalyzer().parse('стали')[0].tag is tag
+    assert pickle.loads(pickle.dumps(tag, pickle.HIGHEST_PROTOCOL)) is tag
+
+
+def test_interned_tags_are_freed(Tag):
+    import gc
+    tag_str = 'NOUN,anim,masc,Name,Fixd sing,gen2'
+    tag = Tag(tag_str)
+    assert tag_str in Tag._instances
+    del tag
+    gc.collect()
+    assert tag_str not in Tag._instances
+
+
 def test_repr(Tag):
     assert repr(Tag('NOUN anim,plur')) == "OpencorporaTag('NOUN anim,plur')"
 
@@ -143,6 +163,21 @@ class TestAttributes:
         # this doesn't raise an exception
         assert tag.gender in set(['masc', 'sing'])
 
+    def test_untyped_attributes(self, Tag):
+        tag = Tag('NOUN,inan,masc plur,accs')
+        Tag.typed_grammemes = False
+        try:
+            assert type(tag.POS) is type('NOUN')
+            assert tag.POS == 'NOUN'
+            assert tag.case == 'accs'
+            assert tag.tense is None
+            assert not tag.POS == 'hello'
+        finally:
+            Tag.typed_grammemes = True
+
+        with pytest.raises(ValueError):
+            tag.POS == 'hello'
+
 
 class TestContains:
 
@@ -182,6 +217,51 @@ class TestContains:
             assert set(['VERB', 'pref']) in tag
 
 
+class TestMasks:
+
+    def test_is_productive(self, Tag):
+        assert Tag('NOUN,inan,masc plur,accs').is_productive()
+        assert not Tag('NPRO,masc,3per,Anph sing,nomn').is_productive()
+        assert not Tag('ADJF,Apro sing,masc,nomn').is_productive()
+
+    def test_masks_match_grammemes(self, morph):
+        Tag = morph.TagClass
+        for tag in morph.dictionary.gramtab[:500]:
+            assert tag.number == next(iter(Tag.NUMBERS & tag.grammemes), None)
+            assert tag.case == next(iter(Tag.CASES & tag.grammemes), None)
+            for grammeme in tag.grammemes:
+                assert grammeme in tag
+
+    def test_updated_grammemes(self, morph):
+        Tag = morph.TagClass
+
+        def updated_grammemes(tag, required):
+            new_grammemes = tag.grammemes | required
+            for grammeme in required:
+                new_grammemes -= Tag._GRAMMEME_INCOMPATIBLE[grammeme]
+            return new_grammemes
+
+        for tag in morph.dictionary.gramtab[:300]:
+            for required in [{'plur'}, {'datv', 'sing'}, {'femn'}, {'sing', 'plur'}]:
+                res = tag.updated_grammemes(required)
+                assert res == updated_grammemes(tag, required)
+                assert isinstance(res, frozenset)
+
+        with pytest.raises(ValueError):
+            Tag('NOUN').updated_grammemes({'foo'})
+
+    def test_init_grammemes_again(self, morph):
+        Tag = morph.TagClass
+        tag = Tag('NOUN,inan,masc plur,accs')
+        bits = dict(Tag._GRAMMEME_BITS)
+
+        # e.g. when another MorphAnalyzer is created
+        pymorphy2.MorphAnalyzer()
+        assert Tag._GRAMMEME_BITS == bits
+        assert tag.case == 'accs'
+        assert 'plur' in tag
+
+
 class TestCyrillic:
     def test_cyr_repr(self, Tag):
         tag = Tag('VERB,perf,tran plur,impr,excl')